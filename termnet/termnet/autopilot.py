@@ -217,7 +217,8 @@ class Autopilot:
             # Build code index
             repo_intel = self.indexer.build_index(
                 include_globs=["**/*.py", "**/*.js", "**/*.ts", "**/*.md"],
-                exclude_globs=["node_modules/**", "__pycache__/**", ".git/**"]
+                exclude_globs=["node_modules/**", "__pycache__/**", ".git/**"],
+                root=self.repo_path
             )
 
             # Get repository state
@@ -3,6 +3,7 @@
 import argparse
 import json
 import os
+import sys
 from datetime import datetime
 
 BANNER = "📊 Autopilot status: Ready"
@@ -181,7 +182,17 @@ def build_parser():
 
 def main(argv=None):
     args = build_parser().parse_args(argv)
-    args.func(args)
+    try:
+        args.func(args)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # Reader went away (e.g. `| head -n 1`); point stdout at devnull so
+        # the interpreter's exit-time flush doesn't raise a second time.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        os.close(devnull)
+        # Output was truncated, so don't report success
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -5,18 +5,60 @@ Builds searchable index of repository code for autonomous planning and editing.
 Follows Google AI best practices: offline-first, deterministic, fast search.
 """
 
+import ast
 import os
 import re
 import json
 import hashlib
+import heapq
+from bisect import bisect_left
 from pathlib import Path
-from typing import Dict, List, Any, Tuple, Set, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Tuple, Set, Optional, Union
+from dataclasses import dataclass, fields
 from collections import defaultdict, Counter
+from collections.abc import Sequence
+from array import array
 import fnmatch
-
-
-@dataclass
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+from operator import attrgetter
+
+
+# Symbol/word patterns, compiled once at import rather than per file
+_IMPORT_RE = re.compile(r'^(?:from\s+(\S+)\s+)?import\s+([^#\n]+)', re.MULTILINE)
+_PY_FUNC_RE = re.compile(r'^[ \t]*def\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(', re.MULTILINE)
+_PY_CLASS_RE = re.compile(r'^[ \t]*class\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*[:\(]', re.MULTILINE)
+_JS_FUNC_RE = re.compile(
+    r'(?:function\s+([a-zA-Z_][a-zA-Z0-9_]*)|([a-zA-Z_][a-zA-Z0-9_]*)\s*:\s*function'
+    r'|([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*(?:\([^)]*\)\s*=>|\([^)]*\)\s*{))'
+)
+_JS_FUNC_DECL_RES = (
+    re.compile(r'function\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(', re.MULTILINE),
+    re.compile(r'const\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*\([^)]*\)\s*=>', re.MULTILINE),
+)
+_JS_CLASS_RE = re.compile(r'class\s+([a-zA-Z_][a-zA-Z0-9_]*)', re.MULTILINE)
+_WORD_RE = re.compile(r'\w+')
+_IMPORT_WORD_RE = re.compile(r'\bimport\b')
+
+# Distinct code_search/who_refs queries remembered per indexer
+_QUERY_CACHE_SIZE = 1024
+
+# str.splitlines() boundaries left once \r and \r\n are normalized to \n
+_LINE_BREAK_RE = re.compile("[\n\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+# Bump when the per-file cache layout or symbol extraction changes
+_FILE_CACHE_VERSION = 6
+
+# Keywords every extracted symbol/import needs; checked on raw bytes before parsing
+_PY_MARKERS = (b"def", b"class", b"import")
+_JS_MARKERS = (b"function", b"const", b"class")
+
+# Below this many files, process start-up costs more than parsing in-process
+_PARALLEL_MIN_FILES = 64
+
+
+@dataclass(slots=True)
 class CodeSymbol:
     """Represents a code symbol (function, class, variable, etc.)."""
     name: str
@@ -27,7 +69,12 @@ class CodeSymbol:
     docstring: str = ""
 
 
-@dataclass
+# Field values in declaration order; the per-file cache stores symbols as these
+# positional lists (a shallow read, unlike asdict's recursive copy)
+_symbol_fields = attrgetter(*(field.name for field in fields(CodeSymbol)))
+
+
+@dataclass(slots=True)
 class SearchResult:
     """Result from code search operation."""
     file_path: str
@@ -37,6 +84,341 @@ class SearchResult:
     relevance_score: float = 0.0
 
 
+class _LazyLines(Sequence):
+    """
+    A file's lines kept as one string plus (start, end) offsets per line.
+
+    Behaves like the list from str.splitlines(), but lines are sliced out on
+    access so an indexed file costs one str object rather than one per line.
+    """
+
+    __slots__ = ('_text', '_bounds')
+
+    def __init__(self, text: str):
+        # Record offsets from a scan for line breaks, without materializing
+        # a list of line strings the way splitlines() would
+        bounds = array('L')
+        start = 0
+        for match in _LINE_BREAK_RE.finditer(text):
+            bounds.append(start)
+            bounds.append(match.start())
+            start = match.end()
+        if start < len(text):
+            bounds.append(start)
+            bounds.append(len(text))
+        self._text = text
+        self._bounds = bounds
+
+    def __len__(self) -> int:
+        return len(self._bounds) // 2
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+        return self._text[self._bounds[2 * index]:self._bounds[2 * index + 1]]
+
+    def __iter__(self):
+        text, bounds = self._text, self._bounds
+        for i in range(0, len(bounds), 2):
+            yield text[bounds[i]:bounds[i + 1]]
+
+    def __eq__(self, other):
+        if isinstance(other, _LazyLines):
+            return self._text == other._text
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"_LazyLines({len(self)} lines)"
+
+
+def _compile_globs(patterns: List[str]) -> "re.Pattern[str]":
+    """Fold fnmatch-style globs into one regex; an empty list never matches."""
+    if not patterns:
+        return re.compile(r'(?!)')
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
+
+
+def _read_source(file_path: str, root: str = ".") -> Tuple[bytes, os.stat_result]:
+    """Read a file's raw bytes along with its stat result."""
+    with open(os.path.join(root, file_path), 'rb') as f:
+        return f.read(), os.fstat(f.fileno())
+
+
+def _content_digest(data: bytes) -> str:
+    """Fingerprint file content for the per-file cache."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _is_cache_hit(cached: Optional[Dict[str, Any]], data: bytes, digest: str) -> bool:
+    """Whether a per-file cache entry describes exactly this content."""
+    return bool(cached) and cached["size"] == len(data) and cached["digest"] == digest
+
+
+def _index_one(file_path: str, cached: Optional[Dict[str, Any]] = None, root: str = ".") -> Dict[str, Any]:
+    """Read and parse a single file without touching any indexer state."""
+    data, stat = _read_source(file_path, root)
+    return _index_data(file_path, data, stat, cached)
+
+
+def _index_data(file_path: str, data: bytes, stat: os.stat_result,
+                cached: Optional[Dict[str, Any]] = None, digest: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parse one file's already-read bytes into an index record.
+
+    Runs in worker processes, so everything it returns must be picklable.
+    ``file_path`` is relative to the indexed root and is what the index is keyed by.
+    When ``cached`` is a per-file cache entry with the same size and content
+    digest, its symbols/imports are reused instead of parsing; line tokens are
+    always rebuilt from the text, which is cheaper than caching them. The digest
+    is always recomputed: mtime and size alone match too easily across copies
+    made with ``cp -p`` or tar extraction.
+    """
+    content = data.decode('utf-8', errors='ignore')
+    if b'\r' in data:
+        # Match text-mode universal newlines
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+
+    # Symbol extraction is skipped entirely when none of the keywords the
+    # parser looks for appear anywhere in the file
+    if file_path.endswith('.py'):
+        has_defs = any(marker in data for marker in _PY_MARKERS)
+    elif file_path.endswith(('.js', '.ts')):
+        has_defs = any(marker in data for marker in _JS_MARKERS)
+    else:
+        has_defs = False
+
+    if digest is None:
+        digest = _content_digest(data)
+    cache_hit = _is_cache_hit(cached, data, digest)
+
+    # Only the decoded text is needed from here on
+    del data
+
+    lines = _LazyLines(content)
+    record = {
+        "path": file_path,
+        "lines": lines,
+        "size": stat.st_size,
+        "digest": digest,
+        "meta": {
+            "size": len(content),
+            "lines": len(lines),
+            "extension": Path(file_path).suffix,
+            "last_modified": stat.st_mtime
+        },
+    }
+
+    # Lowercased token -> line numbers it occurs on; words with 3+ characters
+    # also feed the file-level word index
+    line_tokens: Dict[str, List[int]] = {}
+    for line_num, line in enumerate(lines, 1):
+        for token in set(_WORD_RE.findall(line.lower())):
+            line_tokens.setdefault(token, []).append(line_num)
+    record["line_tokens"] = line_tokens
+    record["words"] = {word for word in line_tokens if len(word) >= 3}
+
+    if cache_hit:
+        symbols = [CodeSymbol(*values) for values in cached["symbols"]]
+        record["symbols"] = {f"{file_path}:{sym.name}": sym for sym in symbols}
+        record["imports"] = list(cached["imports"])
+        return record
+
+    symbols: Dict[str, CodeSymbol] = {}
+    imports: List[str] = []
+
+    # Extract symbols based on file type
+    if has_defs and file_path.endswith('.py'):
+        _extract_python_symbols(file_path, content, symbols, imports)
+    elif has_defs:
+        _extract_js_symbols(file_path, content, symbols)
+
+    record["symbols"] = symbols
+    record["imports"] = imports
+    return record
+
+
+def _try_index_one(file_path: str, cached: Optional[Dict[str, Any]] = None, root: str = "."
+                   ) -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+    """Wrap _index_one so one unreadable file doesn't abort a pooled map."""
+    try:
+        return file_path, _index_one(file_path, cached, root), None
+    except Exception as e:
+        return file_path, None, f"Failed to read {file_path}: {e}"
+
+
+def _try_index_data(file_path: str, data: bytes, stat: os.stat_result,
+                    cached: Optional[Dict[str, Any]] = None, digest: Optional[str] = None
+                    ) -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+    """Wrap _index_data with the same error reporting as _try_index_one."""
+    try:
+        return file_path, _index_data(file_path, data, stat, cached, digest), None
+    except Exception as e:
+        return file_path, None, f"Failed to read {file_path}: {e}"
+
+
+class _SymbolCollector(ast.NodeVisitor):
+    """
+    Collect module- and class-level definitions plus imports from a parsed file.
+
+    Function bodies are not walked for definitions (nested helpers and closures
+    are not indexed). They are only searched for imports when one of the
+    ``import_lines`` falls inside the function, so lazy imports are still seen.
+    """
+
+    def __init__(self, file_path: str, symbols: Dict[str, CodeSymbol],
+                 imports: List[str], import_lines: List[int]):
+        self.file_path = file_path
+        self.symbols = symbols
+        self.imports = imports
+        self.import_lines = import_lines
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        bases = ", ".join(ast.unparse(b) for b in node.bases)
+        self.symbols[f"{self.file_path}:{node.name}"] = CodeSymbol(
+            name=node.name,
+            type="class",
+            file_path=self.file_path,
+            line_number=node.lineno,
+            signature=f"class {node.name}({bases}):" if bases else f"class {node.name}:",
+            docstring=ast.get_docstring(node) or ""
+        )
+        self.generic_visit(node)
+
+    def _visit_function(self, node):
+        prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+        self.symbols[f"{self.file_path}:{node.name}"] = CodeSymbol(
+            name=node.name,
+            type="function",
+            file_path=self.file_path,
+            line_number=node.lineno,
+            signature=f"{prefix} {node.name}({ast.unparse(node.args)})",
+            docstring=ast.get_docstring(node) or ""
+        )
+
+        i = bisect_left(self.import_lines, node.lineno)
+        if i < len(self.import_lines) and self.import_lines[i] <= node.end_lineno:
+            for child in ast.walk(node):
+                if isinstance(child, (ast.Import, ast.ImportFrom)):
+                    self.imports.extend(alias.name for alias in child.names)
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def visit_Import(self, node):
+        self.imports.extend(alias.name for alias in node.names)
+
+    visit_ImportFrom = visit_Import
+
+
+def _import_line_numbers(content: str) -> List[int]:
+    """Sorted line numbers (as ast counts them) containing the word "import"."""
+    line_numbers = []
+    line, pos = 1, 0
+    for match in _IMPORT_WORD_RE.finditer(content):
+        line += content.count('\n', pos, match.start())
+        pos = match.start()
+        if not line_numbers or line_numbers[-1] != line:
+            line_numbers.append(line)
+    return line_numbers
+
+
+def _extract_python_symbols(file_path: str, content: str,
+                            symbols: Dict[str, CodeSymbol], imports: List[str]):
+    """Extract Python symbols with a single AST parse and a lean visitor."""
+    # Collected separately so a visitor that fails halfway leaves nothing behind
+    found_symbols: Dict[str, CodeSymbol] = {}
+    found_imports: List[str] = []
+    try:
+        tree = ast.parse(content, filename=file_path)
+        _SymbolCollector(file_path, found_symbols, found_imports,
+                         _import_line_numbers(content)).visit(tree)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        # Not valid Python 3 (or contains NUL bytes), or nested too deeply for
+        # the parser/visitor (generated code) - fall back to regex scanning
+        _extract_python_symbols_regex(file_path, content, symbols, imports)
+        return
+
+    symbols.update(found_symbols)
+    imports.extend(found_imports)
+
+
+def _extract_python_symbols_regex(file_path: str, content: str,
+                                  symbols: Dict[str, CodeSymbol], imports: List[str]):
+    """Extract Python symbols using regex patterns."""
+    # Extract imports
+    import_matches = _IMPORT_RE.finditer(content)
+    for match in import_matches:
+        imports.extend(imp.strip() for imp in match.group(2).split(','))
+
+    # Extract functions
+    func_matches = _PY_FUNC_RE.finditer(content)
+    for match in func_matches:
+        line_num = content[:match.start()].count('\n') + 1
+        func_name = match.group(1)
+
+        symbols[f"{file_path}:{func_name}"] = CodeSymbol(
+            name=func_name,
+            type="function",
+            file_path=file_path,
+            line_number=line_num,
+            signature=match.group(0).strip()
+        )
+
+    # Extract classes
+    class_matches = _PY_CLASS_RE.finditer(content)
+    for match in class_matches:
+        line_num = content[:match.start()].count('\n') + 1
+        class_name = match.group(1)
+
+        symbols[f"{file_path}:{class_name}"] = CodeSymbol(
+            name=class_name,
+            type="class",
+            file_path=file_path,
+            line_number=line_num,
+            signature=match.group(0).strip()
+        )
+
+
+def _extract_js_symbols(file_path: str, content: str, symbols: Dict[str, CodeSymbol]):
+    """Extract JavaScript/TypeScript symbols."""
+    # Extract function declarations
+    for pattern in _JS_FUNC_DECL_RES:
+        func_matches = pattern.finditer(content)
+        for match in func_matches:
+            line_num = content[:match.start()].count('\n') + 1
+            func_name = match.group(1)
+
+            symbols[f"{file_path}:{func_name}"] = CodeSymbol(
+                name=func_name,
+                type="function",
+                file_path=file_path,
+                line_number=line_num,
+                signature=match.group(0).strip()
+            )
+
+    # Extract class declarations
+    class_matches = _JS_CLASS_RE.finditer(content)
+    for match in class_matches:
+        line_num = content[:match.start()].count('\n') + 1
+        class_name = match.group(1)
+
+        symbols[f"{file_path}:{class_name}"] = CodeSymbol(
+            name=class_name,
+            type="class",
+            file_path=file_path,
+            line_number=line_num,
+            signature=match.group(0).strip()
+        )
+
+
 class CodeIndexer:
     """
     Builds and maintains searchable index of repository code.
@@ -45,15 +427,18 @@ class CodeIndexer:
     codebase structure and find relevant code sections.
     """
 
-    def __init__(self, max_file_size: int = 1024 * 1024, cache_dir: str = None):
+    def __init__(self, max_file_size: int = 1024 * 1024, cache_dir: str = None,
+                 parallel: bool = True):
         """
         Initialize code indexer.
 
         Args:
             max_file_size: Maximum file size to index (bytes)
             cache_dir: Directory for caching index data
+            parallel: Parse files in a process pool when the repo is large enough
         """
         self.max_file_size = max_file_size
+        self.parallel = parallel
         self.cache_dir = cache_dir or ".cache/code_index"
         self._ensure_cache_dir()
 
@@ -62,18 +447,29 @@ class CodeIndexer:
         self.symbols: Dict[str, CodeSymbol] = {}
         self.imports: Dict[str, List[str]] = defaultdict(list)
         self.word_index: Dict[str, Set[str]] = defaultdict(set)
-        self.line_index: Dict[str, List[str]] = {}
+        self.line_index: Dict[str, Sequence[str]] = {}
+        self.postings: Dict[str, Dict[str, List[int]]] = defaultdict(dict)
+        self._line_tokens: Dict[str, Dict[str, List[int]]] = {}
+        self._symbol_keys_lower: Dict[str, str] = {}
+        self._path_pool: Dict[str, str] = {}
 
         # Pattern matchers
         self._init_patterns()
 
-    def build_index(self, include_globs: List[str], exclude_globs: List[str] = None) -> Dict[str, Any]:
+        # Per-instance query caches, cleared whenever the index is rebuilt
+        self._code_search_cached = lru_cache(maxsize=_QUERY_CACHE_SIZE)(self._code_search_uncached)
+        self._who_refs_cached = lru_cache(maxsize=_QUERY_CACHE_SIZE)(self._who_refs_uncached)
+
+    def build_index(self, include_globs: List[str], exclude_globs: List[str] = None,
+                    root: Union[str, Path, None] = None) -> Dict[str, Any]:
         """
         Build comprehensive code index for repository.
 
         Args:
             include_globs: File patterns to include (e.g., ["*.py", "*.md"])
             exclude_globs: File patterns to exclude (e.g., ["__pycache__/*"])
+            root: Repository root to index (defaults to the current directory);
+                indexed paths are relative to it
 
         Returns:
             Repository intelligence dictionary
@@ -83,19 +479,27 @@ class CodeIndexer:
             ".cache/*", "*.egg-info/*", "build/*", "dist/*"
         ]
 
-        # Find files to index
-        files_to_index = self._find_files(include_globs, exclude_globs)
+        root = os.fspath(root) if root else "."
 
-        # Index each file
-        for file_path in files_to_index:
-            try:
-                self._index_file(file_path)
-            except Exception as e:
+        # Find files to index
+        files_to_index = self._find_files(include_globs, exclude_globs, root)
+
+        # Index each file, merging results back in path order; unchanged
+        # files reuse their parse results from the per-file cache
+        file_cache = self._load_file_cache(root)
+        records = []
+        for file_path, record, error in self._index_files(files_to_index, file_cache, root):
+            if error:
                 # Log error but continue indexing
-                print(f"Warning: Failed to index {file_path}: {e}")
+                print(f"Warning: Failed to index {file_path}: {error}")
+                continue
+            self._merge_record(record)
+            records.append(record)
+        self._cache_file_records(records, root, file_cache)
 
-        # Build inverted word index
-        self._build_word_index()
+        # Earlier query results may no longer match the index
+        self._code_search_cached.cache_clear()
+        self._who_refs_cached.cache_clear()
 
         # Generate repository intelligence
         repo_intel = self._generate_repo_intel()
@@ -116,14 +520,22 @@ class CodeIndexer:
         Returns:
             List of search results ordered by relevance
         """
+        return list(self._code_search_cached(query, max_results))
+
+    def _code_search_uncached(self, query: str, max_results: int) -> List[SearchResult]:
+        """Run a code search against the current index."""
         results = []
         query_lower = query.lower()
-        query_words = set(re.findall(r'\w+', query_lower))
+        query_words = set(_WORD_RE.findall(query_lower))
+
+        # Lines within two of an existing result, which content hits skip
+        covered: Set[Tuple[str, int]] = set()
 
         # Search in symbols first (high relevance)
         for symbol_name, symbol in self.symbols.items():
-            if query_lower in symbol_name.lower():
+            if query_lower in self._symbol_keys_lower[symbol_name]:
                 snippet = self._get_code_snippet(symbol.file_path, symbol.line_number)
+                covered.update((symbol.file_path, symbol.line_number + d) for d in range(-2, 3))
                 results.append(SearchResult(
                     file_path=symbol.file_path,
                     line_number=symbol.line_number,
@@ -133,24 +545,67 @@ class CodeIndexer:
                 ))
 
         # Search in file content (medium relevance)
+        candidates = self._candidate_lines(query_lower)
         for file_path, lines in self.line_index.items():
-            for line_num, line in enumerate(lines, 1):
+            if candidates is None:
+                line_nums = range(1, len(lines) + 1)
+            else:
+                line_nums = sorted(candidates.get(file_path, ()))
+
+            for line_num in line_nums:
+                if line_num > len(lines):
+                    continue
+                line = lines[line_num - 1]
                 if query_lower in line.lower():
                     # Skip if we already have this from symbols
-                    if any(r.file_path == file_path and abs(r.line_number - line_num) <= 2 for r in results):
+                    if (file_path, line_num) in covered:
                         continue
 
+                    covered.update((file_path, line_num + d) for d in range(-2, 3))
                     results.append(SearchResult(
                         file_path=file_path,
                         line_number=line_num,
                         snippet=line.strip(),
                         context="content",
-                        relevance_score=self._calculate_content_relevance(query_words, line)
+                        relevance_score=self._calculate_content_relevance(query_words, file_path, line_num)
                     ))
 
-        # Sort by relevance and limit results
-        results.sort(key=lambda x: x.relevance_score, reverse=True)
-        return results[:max_results]
+        # Top results by relevance (same order as a stable descending sort)
+        return heapq.nlargest(max_results, results, key=attrgetter("relevance_score"))
+
+    def _candidate_lines(self, query_lower: str) -> Optional[Dict[str, Set[int]]]:
+        """
+        Narrow a content search to lines that could contain the query.
+
+        Every word in the query must appear inside some token on a matching
+        line, so intersecting the postings of tokens that contain each query
+        word gives a superset of the real matches. Returns None when the query
+        has no word characters and every line has to be scanned.
+        """
+        query_tokens = set(_WORD_RE.findall(query_lower))
+        if not query_tokens:
+            return None
+
+        candidates: Optional[Dict[str, Set[int]]] = None
+        for query_token in query_tokens:
+            hits: Dict[str, Set[int]] = defaultdict(set)
+            for token, files in self.postings.items():
+                if query_token in token:
+                    for file_path, line_nums in files.items():
+                        hits[file_path].update(line_nums)
+
+            if candidates is None:
+                candidates = hits
+            else:
+                candidates = {
+                    file_path: line_nums & hits[file_path]
+                    for file_path, line_nums in candidates.items()
+                    if file_path in hits
+                }
+            if not candidates:
+                return {}
+
+        return candidates
 
     def who_refs(self, symbol: str) -> List[str]:
         """
@@ -162,6 +617,10 @@ class CodeIndexer:
         Returns:
             List of file paths that reference the symbol
         """
+        return list(self._who_refs_cached(symbol))
+
+    def _who_refs_uncached(self, symbol: str) -> List[str]:
+        """Scan imports and source lines for references to a symbol."""
         referencing_files = []
 
         # Search in imports
@@ -170,13 +629,14 @@ class CodeIndexer:
                 referencing_files.append(file_path)
 
         # Search in code content
+        ref_re = re.compile(rf'\b{re.escape(symbol)}\b')
         for file_path, lines in self.line_index.items():
             if file_path in referencing_files:
                 continue  # Already found via imports
 
             for line in lines:
                 # Look for symbol usage (simple heuristic)
-                if re.search(rf'\b{re.escape(symbol)}\b', line):
+                if ref_re.search(line):
                     referencing_files.append(file_path)
                     break
 
@@ -237,143 +697,135 @@ class CodeIndexer:
 
         return impact_data
 
-    def _find_files(self, include_globs: List[str], exclude_globs: List[str]) -> List[str]:
+    def _find_files(self, include_globs: List[str], exclude_globs: List[str], root: str = ".") -> List[str]:
         """Find files matching include patterns and not matching exclude patterns."""
-        all_files = []
+        return sorted(self._iter_files(root, include_globs, exclude_globs))
 
-        # Walk directory tree
-        for root, dirs, files in os.walk("."):
-            # Skip directories that match exclude patterns
-            dirs[:] = [d for d in dirs if not any(
-                fnmatch.fnmatch(os.path.join(root, d), pattern) for pattern in exclude_globs
-            )]
+    def _iter_files(self, root: str, include_globs: List[str], exclude_globs: List[str]):
+        """
+        Crawl the tree with os.scandir, yielding indexable relative paths.
 
-            for file in files:
-                file_path = os.path.join(root, file)
-                file_path = file_path.replace("./", "")  # Normalize path
+        Directories covered by a "dir/*" or "dir/**" exclude pattern are pruned
+        before descending; file type comes from the dirent so only candidate
+        files are stat'ed for the size check.
+        """
+        include_re = _compile_globs(include_globs)
+        exclude_re = _compile_globs(exclude_globs)
+        dir_exclude_re = _compile_globs([
+            pattern.rstrip("*")[:-1] for pattern in exclude_globs
+            if pattern.endswith("/*") or pattern.endswith("/**")
+        ])
+
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            try:
+                with os.scandir(os.path.join(root, rel_dir) if rel_dir else root) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+
+            for entry in entries:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not dir_exclude_re.match(rel_path):
+                            stack.append(rel_path)
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
 
                 # Check exclude patterns
-                if any(fnmatch.fnmatch(file_path, pattern) for pattern in exclude_globs):
+                if exclude_re.match(rel_path):
                     continue
 
                 # Check include patterns
-                if any(fnmatch.fnmatch(file_path, pattern) for pattern in include_globs):
+                if include_re.match(rel_path):
                     # Check file size
                     try:
-                        if os.path.getsize(file_path) <= self.max_file_size:
-                            all_files.append(file_path)
+                        if entry.stat().st_size <= self.max_file_size:
+                            yield rel_path
                     except OSError:
                         continue
 
-        return sorted(all_files)
-
-    def _index_file(self, file_path: str):
-        """Index a single file."""
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-
-            lines = content.splitlines()
-            self.line_index[file_path] = lines
-
-            # Store file metadata
-            self.files[file_path] = {
-                "size": len(content),
-                "lines": len(lines),
-                "extension": Path(file_path).suffix,
-                "last_modified": os.path.getmtime(file_path)
-            }
-
-            # Extract symbols based on file type
-            if file_path.endswith('.py'):
-                self._extract_python_symbols(file_path, content, lines)
-            elif file_path.endswith(('.js', '.ts')):
-                self._extract_js_symbols(file_path, content, lines)
-
-        except Exception as e:
-            raise Exception(f"Failed to read {file_path}: {e}")
-
-    def _extract_python_symbols(self, file_path: str, content: str, lines: List[str]):
-        """Extract Python symbols using regex patterns."""
-        # Extract imports
-        import_matches = re.finditer(r'^(?:from\s+(\S+)\s+)?import\s+([^#\n]+)', content, re.MULTILINE)
-        for match in import_matches:
-            module = match.group(1) or "builtins"
-            imports = [imp.strip() for imp in match.group(2).split(',')]
-            self.imports[file_path].extend(imports)
-
-        # Extract functions
-        func_matches = re.finditer(self.patterns['python_function'], content, re.MULTILINE)
-        for match in func_matches:
-            line_num = content[:match.start()].count('\n') + 1
-            func_name = match.group(1)
-
-            self.symbols[f"{file_path}:{func_name}"] = CodeSymbol(
-                name=func_name,
-                type="function",
-                file_path=file_path,
-                line_number=line_num,
-                signature=match.group(0).strip()
-            )
-
-        # Extract classes
-        class_matches = re.finditer(self.patterns['python_class'], content, re.MULTILINE)
-        for match in class_matches:
-            line_num = content[:match.start()].count('\n') + 1
-            class_name = match.group(1)
-
-            self.symbols[f"{file_path}:{class_name}"] = CodeSymbol(
-                name=class_name,
-                type="class",
-                file_path=file_path,
-                line_number=line_num,
-                signature=match.group(0).strip()
-            )
-
-    def _extract_js_symbols(self, file_path: str, content: str, lines: List[str]):
-        """Extract JavaScript/TypeScript symbols."""
-        # Extract function declarations
-        func_patterns = [
-            r'function\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(',
-            r'const\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*\([^)]*\)\s*=>'
-        ]
-
-        for pattern in func_patterns:
-            func_matches = re.finditer(pattern, content, re.MULTILINE)
-            for match in func_matches:
-                line_num = content[:match.start()].count('\n') + 1
-                func_name = match.group(1)
-
-                self.symbols[f"{file_path}:{func_name}"] = CodeSymbol(
-                    name=func_name,
-                    type="function",
-                    file_path=file_path,
-                    line_number=line_num,
-                    signature=match.group(0).strip()
-                )
-
-        # Extract class declarations
-        class_matches = re.finditer(r'class\s+([a-zA-Z_][a-zA-Z0-9_]*)', content, re.MULTILINE)
-        for match in class_matches:
-            line_num = content[:match.start()].count('\n') + 1
-            class_name = match.group(1)
+    def _index_files(self, files_to_index: List[str],
+                     file_cache: Optional[Dict[str, Dict[str, Any]]] = None, root: str = "."):
+        """
+        Index files, resolving per-file cache hits in-process.
 
-            self.symbols[f"{file_path}:{class_name}"] = CodeSymbol(
-                name=class_name,
-                type="class",
-                file_path=file_path,
-                line_number=line_num,
-                signature=match.group(0).strip()
-            )
+        Every file is read and hashed here; only cache misses need parsing, and
+        those go to a process pool when there are enough of them to pay for it.
+        """
+        file_cache = file_cache or {}
+        use_pool = self.parallel and (os.cpu_count() or 1) > 1
+        results = {}
+        # Misses keep their bytes for in-process parsing until it is clear the
+        # pool will take them (workers re-read), so a cold build of a big repo
+        # is never held in memory at once
+        misses: Dict[str, Optional[Tuple[bytes, os.stat_result, str]]] = {}
+        for file_path in files_to_index:
+            try:
+                data, stat = _read_source(file_path, root)
+            except Exception as e:
+                results[file_path] = (file_path, None, f"Failed to read {file_path}: {e}")
+                continue
+            cached = file_cache.get(file_path)
+            digest = _content_digest(data)
+            if _is_cache_hit(cached, data, digest):
+                results[file_path] = _try_index_data(file_path, data, stat, cached, digest)
+            elif use_pool and len(misses) >= _PARALLEL_MIN_FILES:
+                misses[file_path] = None
+            else:
+                misses[file_path] = (data, stat, digest)
+                if use_pool and len(misses) >= _PARALLEL_MIN_FILES:
+                    misses = dict.fromkeys(misses)
 
-    def _build_word_index(self):
-        """Build inverted word index for fast text search."""
-        for file_path, lines in self.line_index.items():
-            for line in lines:
-                words = re.findall(r'\w+', line.lower())
-                for word in words:
-                    if len(word) >= 3:  # Index words with 3+ characters
-                        self.word_index[word].add(file_path)
+        if use_pool and len(misses) >= _PARALLEL_MIN_FILES:
+            try:
+                with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+                    for result in executor.map(_try_index_one, list(misses), repeat(None),
+                                                repeat(root), chunksize=32):
+                        results[result[0]] = result
+                misses = {}
+            except (OSError, RuntimeError):
+                # No usable pool here (restricted sandbox, broken worker) - go serial
+                pass
+        for file_path, source in misses.items():
+            if source is None:
+                results[file_path] = _try_index_one(file_path, None, root)
+            else:
+                results[file_path] = _try_index_data(file_path, *source[:2], None, source[2])
+
+        return [results[file_path] for file_path in files_to_index]
+
+    def _intern_path(self, file_path: str) -> str:
+        """Return the canonical str object for a path (records from workers and the cache carry copies)."""
+        return self._path_pool.setdefault(file_path, file_path)
+
+    def _merge_record(self, record: Dict[str, Any]):
+        """Fold one file's parse results into the shared index structures."""
+        # Every structure below refers to the file through the same str object
+        file_path = self._intern_path(record["path"])
+        self.line_index[file_path] = record["lines"]
+        self.files[file_path] = record["meta"]
+        for key, symbol in record["symbols"].items():
+            symbol.file_path = file_path
+            self.symbols[key] = symbol
+            self._symbol_keys_lower[key] = key.lower()
+        if record["imports"]:
+            self.imports[file_path].extend(record["imports"])
+
+        # Inverted word index for fast text search
+        for word in record["words"]:
+            self.word_index[word].add(file_path)
+        # Drop postings left over from an earlier version of a re-indexed file
+        for token in self._line_tokens.get(file_path, {}).keys() - record["line_tokens"].keys():
+            self.postings[token].pop(file_path, None)
+        self._line_tokens[file_path] = record["line_tokens"]
+        for token, line_nums in record["line_tokens"].items():
+            self.postings[token][file_path] = line_nums
 
     def _generate_repo_intel(self) -> Dict[str, Any]:
         """Generate repository intelligence summary."""
@@ -411,11 +863,11 @@ class CodeIndexer:
         return hashlib.md5(json.dumps(index_data, sort_keys=True).encode()).hexdigest()[:12]
 
     def _init_patterns(self):
-        """Initialize regex patterns for symbol extraction."""
+        """Expose the precompiled symbol-extraction patterns."""
         self.patterns = {
-            'python_function': r'^[ \t]*def\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(',
-            'python_class': r'^[ \t]*class\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*[:\(]',
-            'js_function': r'(?:function\s+([a-zA-Z_][a-zA-Z0-9_]*)|([a-zA-Z_][a-zA-Z0-9_]*)\s*:\s*function|([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*(?:\([^)]*\)\s*=>|\([^)]*\)\s*{))',
+            'python_function': _PY_FUNC_RE,
+            'python_class': _PY_CLASS_RE,
+            'js_function': _JS_FUNC_RE,
         }
 
     def _get_code_snippet(self, file_path: str, line_number: int, context_lines: int = 2) -> str:
@@ -454,15 +906,25 @@ class CodeIndexer:
 
         return 0.1
 
-    def _calculate_content_relevance(self, query_words: Set[str], line: str) -> float:
-        """Calculate relevance score for content match."""
-        line_words = set(re.findall(r'\w+', line.lower()))
-        matches = query_words & line_words
+    def _calculate_content_relevance(self, query_words: Set[str], file_path: str, line_num: int) -> float:
+        """
+        Calculate relevance score for content match.
 
+        The share of query words that occur as whole tokens on the line, read
+        from the postings (sorted line numbers) instead of re-tokenizing it.
+        """
         if not query_words:
             return 0.0
 
-        return len(matches) / len(query_words)
+        matches = 0
+        for word in query_words:
+            line_nums = self.postings[word].get(file_path) if word in self.postings else None
+            if line_nums:
+                i = bisect_left(line_nums, line_num)
+                if i < len(line_nums) and line_nums[i] == line_num:
+                    matches += 1
+
+        return matches / len(query_words)
 
     def _ensure_cache_dir(self):
         """Ensure cache directory exists."""
@@ -477,6 +939,55 @@ class CodeIndexer:
         except Exception as e:
             print(f"Warning: Failed to cache index: {e}")
 
+    def _file_cache_path(self, root: str) -> str:
+        """Per-file cache location for one indexed root (paths in it are root-relative)."""
+        root_digest = hashlib.blake2b(os.path.realpath(root).encode(), digest_size=8).hexdigest()
+        return os.path.join(self.cache_dir, f"file_index-{root_digest}.json")
+
+    def _load_file_cache(self, root: str = ".") -> Dict[str, Dict[str, Any]]:
+        """Load per-file parse results from the last build of ``root``, if compatible."""
+        try:
+            with open(self._file_cache_path(root), 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if cache.get("version") != _FILE_CACHE_VERSION or cache.get("root") != os.path.realpath(root):
+            return {}
+        return cache.get("files", {})
+
+    def _cache_file_records(self, records: List[Dict[str, Any]], root: str = ".",
+                            previous: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Persist per-file parse results keyed by path and content digest.
+
+        The write is skipped when ``previous`` (the cache loaded for this build)
+        already holds exactly these files with the same digests.
+        """
+        if previous and len(previous) == len(records) and all(
+                previous.get(record["path"], {}).get("digest") == record["digest"]
+                for record in records):
+            return
+
+        cache_file = self._file_cache_path(root)
+        files = {
+            record["path"]: {
+                "size": record["size"],
+                "digest": record["digest"],
+                "symbols": [_symbol_fields(sym) for sym in record["symbols"].values()],
+                "imports": record["imports"],
+            }
+            for record in records
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_file = f"{cache_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump({"version": _FILE_CACHE_VERSION, "root": os.path.realpath(root),
+                           "files": files}, f)
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            print(f"Warning: Failed to cache file index: {e}")
+
     def load_cached_index(self) -> Optional[Dict[str, Any]]:
         """Load cached index if available and fresh."""
         cache_file = os.path.join(self.cache_dir, "repo_intel.json")
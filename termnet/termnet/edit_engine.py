@@ -7,15 +7,23 @@ Follows Google AI best practices: idempotent operations, clear error handling.
 
 import os
 import re
+import uuid
 import difflib
 import tempfile
 import shutil
 import hashlib
 from pathlib import Path
 from typing import Dict, List, Any, Tuple, Optional
+from collections import OrderedDict
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
+from .code_indexer import _compile_globs
+
+
+# Parsed diffs remembered per engine, keyed by a digest of the diff text
+_DIFF_CACHE_SIZE = 128
+
 
 @dataclass
 class EditResult:
@@ -60,6 +68,11 @@ class EditEngine:
         self._setup_defaults()
         self._backup_dir = None
 
+        guardrails = self.config["write_guardrails"]
+        self._allow_re = _compile_globs(guardrails["allowed_paths"])
+        self._block_re = _compile_globs(guardrails["blocked_paths"])
+        self._diff_cache: "OrderedDict[bytes, Dict[str, List[Dict[str, Any]]]]" = OrderedDict()
+
     def apply_patch(self, diff: str, dry_run: bool = True) -> EditResult:
         """
         Apply a unified diff patch to the repository.
@@ -73,7 +86,7 @@ class EditEngine:
         """
         # Parse the diff
         try:
-            patches = self._parse_unified_diff(diff)
+            patches = self._parse_diff_cached(diff)
         except Exception as e:
             return EditResult(
                 status="error",
@@ -92,8 +105,12 @@ class EditEngine:
                 message=f"Guardrail violations: {[v.reason for v in violations]}"
             )
 
+        # File contents read during this call, shared by the idempotency check,
+        # dry run and apply steps so each file is read at most once
+        contents: Dict[str, List[str]] = {}
+
         # Check if patch is idempotent (already applied)
-        idempotent_check = self._check_idempotency(patches)
+        idempotent_check = self._check_idempotency(patches, contents)
         if idempotent_check:
             return EditResult(
                 status="success",
@@ -111,12 +128,7 @@ class EditEngine:
                 for file_path, hunks in patches.items():
                     repo_path = self.config.get("repo_path", ".")
                     full_path = os.path.join(repo_path, file_path)
-
-                    if os.path.exists(full_path):
-                        with open(full_path, 'r', encoding='utf-8') as f:
-                            content = f.readlines()
-                    else:
-                        content = []
+                    content = self._read_lines(full_path, contents)
 
                     # Try to apply hunks in memory
                     try:
@@ -151,7 +163,7 @@ class EditEngine:
                 )
 
         # Apply patches with conflict handling
-        return self._apply_patches_with_retry(patches, diff)
+        return self._apply_patches_with_retry(patches, diff, contents)
 
     def _setup_defaults(self):
         """Setup default configuration values."""
@@ -178,6 +190,20 @@ class EditEngine:
             elif isinstance(value, dict):
                 self.config[key] = {**value, **self.config.get(key, {})}
 
+    def _parse_diff_cached(self, diff: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Parse a diff, reusing the result when the same diff was seen recently."""
+        key = hashlib.blake2b(diff.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        patches = self._diff_cache.get(key)
+        if patches is not None:
+            self._diff_cache.move_to_end(key)
+            return patches
+
+        patches = self._parse_unified_diff(diff)
+        self._diff_cache[key] = patches
+        if len(self._diff_cache) > _DIFF_CACHE_SIZE:
+            self._diff_cache.popitem(last=False)
+        return patches
+
     def _parse_unified_diff(self, diff: str) -> Dict[str, List[Dict[str, Any]]]:
         """
         Parse unified diff into structured format.
@@ -272,7 +298,7 @@ class EditEngine:
         # Check file paths
         for file_path in patches.keys():
             # Check blocked paths
-            if self._matches_patterns(file_path, guardrails["blocked_paths"]):
+            if self._block_re.match(file_path):
                 violations.append(GuardrailViolation(
                     rule="blocked_paths",
                     file_path=file_path,
@@ -280,7 +306,7 @@ class EditEngine:
                 ))
 
             # Check allowed paths
-            if not self._matches_patterns(file_path, guardrails["allowed_paths"]):
+            if not self._allow_re.match(file_path):
                 violations.append(GuardrailViolation(
                     rule="allowed_paths",
                     file_path=file_path,
@@ -289,15 +315,47 @@ class EditEngine:
 
         return violations
 
-    def _matches_patterns(self, file_path: str, patterns: List[str]) -> bool:
-        """Check if file path matches any of the given patterns."""
-        import fnmatch
-        for pattern in patterns:
-            if fnmatch.fnmatch(file_path, pattern):
-                return True
-        return False
+    def _read_lines(self, full_path: str, contents: Optional[Dict[str, List[str]]] = None) -> List[str]:
+        """Read a file's lines, reusing an earlier read from the same apply_patch call."""
+        if contents is not None and full_path in contents:
+            return contents[full_path]
+
+        if os.path.exists(full_path):
+            with open(full_path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        else:
+            lines = []
+
+        if contents is not None:
+            contents[full_path] = lines
+        return lines
+
+    def _atomic_write(self, full_path: str, text: str):
+        """
+        Replace a file's contents via a temp file and rename.
+
+        A crash mid-write leaves the original file intact instead of truncated.
+        Existing permissions are kept; new files get the usual umask defaults.
+        """
+        directory = os.path.dirname(full_path) or "."
+        tmp_path = os.path.join(directory, f".{os.path.basename(full_path)}.{uuid.uuid4().hex[:8]}.tmp")
 
-    def _check_idempotency(self, patches: Dict[str, List[Dict[str, Any]]]) -> bool:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(text.encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(full_path):
+                shutil.copymode(full_path, tmp_path)
+            os.replace(tmp_path, full_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _check_idempotency(self, patches: Dict[str, List[Dict[str, Any]]],
+                           contents: Optional[Dict[str, List[str]]] = None) -> bool:
         """Check if patch is already applied (idempotent)."""
         for file_path, hunks in patches.items():
             # Resolve file path relative to repo_path
@@ -309,8 +367,7 @@ class EditEngine:
                 return False
 
             try:
-                with open(full_path, 'r', encoding='utf-8') as f:
-                    current_content = f.readlines()
+                current_content = self._read_lines(full_path, contents)
 
                 # Check if hunks are already applied
                 for hunk in hunks:
@@ -398,14 +455,15 @@ class EditEngine:
 
         return True
 
-    def _apply_patches_with_retry(self, patches: Dict[str, List[Dict[str, Any]]], original_diff: str) -> EditResult:
+    def _apply_patches_with_retry(self, patches: Dict[str, List[Dict[str, Any]]], original_diff: str,
+                                  contents: Optional[Dict[str, List[str]]] = None) -> EditResult:
         """Apply patches with conflict resolution and retry logic."""
         # Create backup
         self._create_backup(list(patches.keys()))
 
         try:
             # First attempt: apply all patches
-            conflicts = self._apply_patches(patches)
+            conflicts = self._apply_patches(patches, contents)
 
             if not conflicts:
                 return EditResult(
@@ -450,7 +508,8 @@ class EditEngine:
                 message=f"Error applying patch: {e}"
             )
 
-    def _apply_patches(self, patches: Dict[str, List[Dict[str, Any]]]) -> List[str]:
+    def _apply_patches(self, patches: Dict[str, List[Dict[str, Any]]],
+                       contents: Optional[Dict[str, List[str]]] = None) -> List[str]:
         """Apply patches and return list of conflicts."""
         conflicts = []
 
@@ -459,12 +518,7 @@ class EditEngine:
                 # Resolve file path relative to repo_path
                 repo_path = self.config.get("repo_path", ".")
                 full_path = os.path.join(repo_path, file_path)
-
-                if os.path.exists(full_path):
-                    with open(full_path, 'r', encoding='utf-8') as f:
-                        content = f.readlines()
-                else:
-                    content = []
+                content = self._read_lines(full_path, contents)
 
                 new_content = self._apply_hunks_to_content(content, hunks)
 
@@ -472,8 +526,7 @@ class EditEngine:
                 if os.path.dirname(full_path):
                     os.makedirs(os.path.dirname(full_path), exist_ok=True)
 
-                with open(full_path, 'w', encoding='utf-8') as f:
-                    f.writelines(new_content)
+                self._atomic_write(full_path, ''.join(new_content))
 
             except Exception as e:
                 conflicts.append(f"{file_path}:apply_error:{e}")
@@ -494,32 +547,30 @@ class EditEngine:
 
     def _apply_single_hunk(self, content: List[str], hunk: Dict[str, Any]) -> List[str]:
         """Apply a single hunk to content."""
-        old_start = hunk["old_start"] - 1  # Convert to 0-based
-        new_content = content[:]
-
-        # Track current position in the file
-        pos = old_start
+        # Convert to 0-based; "-0,0" hunks (pure additions) insert at the top
+        old_start = max(hunk["old_start"] - 1, 0)
 
-        # Process hunk lines in order, applying changes immediately
+        # Build the replacement block while walking the original lines, then
+        # splice it in once instead of inserting/deleting line by line
+        block = []
+        src = old_start
         for line in hunk["lines"]:
             if line.startswith(' '):
-                # Context line - verify it matches and advance position
-                pos += 1
+                # Context line - keep it and advance
+                if src < len(content):
+                    block.append(content[src])
+                src += 1
             elif line.startswith('-'):
-                # Delete line at current position
-                if pos < len(new_content):
-                    del new_content[pos]
-                # Don't advance pos since we deleted a line
+                # Deleted line - skip it in the original
+                src += 1
             elif line.startswith('+'):
-                # Insert line at current position
+                # Added line
                 new_line = line[1:]
                 if not new_line.endswith('\n'):
                     new_line += '\n'
-                new_content.insert(pos, new_line)
-                # Advance position since we inserted a line
-                pos += 1
+                block.append(new_line)
 
-        return new_content
+        return content[:old_start] + block + content[src:]
 
     def _retry_with_split_hunks(self, patches: Dict[str, List[Dict[str, Any]]], conflicts: List[str]) -> List[str]:
         """Retry applying patches by splitting conflicting hunks."""
@@ -548,8 +599,7 @@ class EditEngine:
             # In practice, you'd implement more sophisticated hunk splitting
             modified_content = self._apply_single_hunk(content, hunk)
 
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.writelines(modified_content)
+            self._atomic_write(file_path, ''.join(modified_content))
 
             return True
 
@@ -595,7 +645,7 @@ class EditEngine:
             Preview information including files, lines changed, etc.
         """
         try:
-            patches = self._parse_unified_diff(diff)
+            patches = self._parse_diff_cached(diff)
             violations = self._check_guardrails(patches)
 
             files_affected = list(patches.keys())
@@ -11,11 +11,36 @@ import json
 import re
 import logging
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple, Set
+from typing import Dict, List, Any, Optional, Sequence, Tuple, Set
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from enum import Enum
 import hashlib
+from functools import lru_cache
+
+try:
+    import orjson  # optional, faster (de)serialization
+except ImportError:
+    orjson = None
+
+
+def _dumps(obj: Any, pretty: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    return json.dumps(obj, indent=2 if pretty else None).encode()
+
+
+def _loads(data: bytes) -> Any:
+    """Deserialize JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _keyword_re(*keywords: str) -> "re.Pattern[str]":
+    """Compile keywords into one substring-matching alternation."""
+    return re.compile("|".join(map(re.escape, keywords)))
 
 
 class FeedbackType(Enum):
@@ -38,7 +63,7 @@ class FeedbackSeverity(Enum):
     CRITICAL = "critical"
 
 
-@dataclass
+@dataclass(slots=True)
 class FeedbackItem:
     """Individual piece of feedback about code."""
     id: str
@@ -52,23 +77,23 @@ class FeedbackItem:
     suggested_fix: Optional[str] = None
     reviewer: Optional[str] = None
     timestamp: str = None
-    tags: List[str] = None
+    tags: Sequence[str] = ()  # shared empty default; nothing appends to tags in place
     metadata: Dict[str, Any] = None
 
     def __post_init__(self):
         if self.timestamp is None:
             self.timestamp = datetime.now().isoformat()
         if self.tags is None:
-            self.tags = []
+            self.tags = ()
         if self.metadata is None:
             self.metadata = {}
         if self.id is None:
             # Generate ID from content hash
             content = f"{self.title}{self.description}{self.file_path}{self.line_number}"
-            self.id = hashlib.md5(content.encode()).hexdigest()[:8]
+            self.id = hashlib.blake2b(content.encode(), digest_size=4).hexdigest()
 
 
-@dataclass
+@dataclass(slots=True)
 class FeedbackPattern:
     """Pattern learned from feedback."""
     pattern_id: str
@@ -98,6 +123,61 @@ class FeedbackSummary:
     confidence_score: float
 
 
+# Keyword tables are checked in order; the first category that matches wins.
+_CATEGORY_RULES = (
+    (_keyword_re('security', 'vulnerability', 'exploit'), FeedbackType.SECURITY_CONCERN),
+    (_keyword_re('performance', 'slow', 'optimize', 'efficient'), FeedbackType.PERFORMANCE_ISSUE),
+    (_keyword_re('style', 'format', 'lint', 'convention'), FeedbackType.STYLE_VIOLATION),
+    (_keyword_re('design', 'architecture', 'pattern'), FeedbackType.DESIGN_FEEDBACK),
+)
+
+_SEVERITY_RULES = (
+    (_keyword_re('critical', 'blocker', 'must fix', 'breaking'), FeedbackSeverity.CRITICAL),
+    (_keyword_re('important', 'should fix', 'high priority'), FeedbackSeverity.HIGH),
+    (_keyword_re('nit', 'minor', 'suggestion', 'consider'), FeedbackSeverity.LOW),
+    (_keyword_re('info', 'note', 'fyi'), FeedbackSeverity.INFO),
+)
+
+_HASHTAG_RE = re.compile(r'#(\w+)')
+
+_TAG_RULES = (
+    ('bug', _keyword_re('bug', 'error', 'issue')),
+    ('refactor', _keyword_re('refactor', 'cleanup', 'reorganize')),
+    ('documentation', _keyword_re('docs', 'documentation', 'comment')),
+    ('testing', _keyword_re('test', 'testing', 'coverage')),
+    ('performance', _keyword_re('performance', 'optimize', 'speed')),
+    ('security', _keyword_re('security', 'auth', 'permission')),
+)
+
+_COMMENT_CACHE_SIZE = 4096
+
+
+def _categorize_comment(comment_text: str) -> FeedbackType:
+    """Categorize a comment by the first matching keyword table."""
+    comment_lower = comment_text.lower()
+
+    for keyword_re, feedback_type in _CATEGORY_RULES:
+        if keyword_re.search(comment_lower):
+            return feedback_type
+    return FeedbackType.CODE_REVIEW
+
+
+def _comment_severity(comment_text: str) -> FeedbackSeverity:
+    """Assess comment severity by the first matching keyword table."""
+    comment_lower = comment_text.lower()
+
+    for keyword_re, severity in _SEVERITY_RULES:
+        if keyword_re.search(comment_lower):
+            return severity
+    return FeedbackSeverity.MEDIUM
+
+
+# Re-ingested reviews repeat comment bodies; set TERMNET_FEEDBACK_NOCACHE=1 to disable
+if os.getenv("TERMNET_FEEDBACK_NOCACHE", "0") != "1":
+    _categorize_comment = lru_cache(maxsize=_COMMENT_CACHE_SIZE)(_categorize_comment)
+    _comment_severity = lru_cache(maxsize=_COMMENT_CACHE_SIZE)(_comment_severity)
+
+
 class FeedbackParser:
     """Parses feedback from various sources."""
 
@@ -188,55 +268,21 @@ class FeedbackParser:
 
     def _categorize_github_comment(self, comment_text: str) -> FeedbackType:
         """Categorize GitHub comment by content."""
-        comment_lower = comment_text.lower()
-
-        if any(keyword in comment_lower for keyword in ['security', 'vulnerability', 'exploit']):
-            return FeedbackType.SECURITY_CONCERN
-        elif any(keyword in comment_lower for keyword in ['performance', 'slow', 'optimize', 'efficient']):
-            return FeedbackType.PERFORMANCE_ISSUE
-        elif any(keyword in comment_lower for keyword in ['style', 'format', 'lint', 'convention']):
-            return FeedbackType.STYLE_VIOLATION
-        elif any(keyword in comment_lower for keyword in ['design', 'architecture', 'pattern']):
-            return FeedbackType.DESIGN_FEEDBACK
-        else:
-            return FeedbackType.CODE_REVIEW
+        return _categorize_comment(comment_text)
 
     def _assess_severity(self, comment_text: str) -> FeedbackSeverity:
         """Assess severity of feedback based on content."""
-        comment_lower = comment_text.lower()
-
-        if any(keyword in comment_lower for keyword in ['critical', 'blocker', 'must fix', 'breaking']):
-            return FeedbackSeverity.CRITICAL
-        elif any(keyword in comment_lower for keyword in ['important', 'should fix', 'high priority']):
-            return FeedbackSeverity.HIGH
-        elif any(keyword in comment_lower for keyword in ['nit', 'minor', 'suggestion', 'consider']):
-            return FeedbackSeverity.LOW
-        elif any(keyword in comment_lower for keyword in ['info', 'note', 'fyi']):
-            return FeedbackSeverity.INFO
-        else:
-            return FeedbackSeverity.MEDIUM
+        return _comment_severity(comment_text)
 
     def _extract_tags(self, text: str) -> List[str]:
         """Extract tags from text content."""
-        tags = []
-
         # Look for hashtags
-        hashtags = re.findall(r'#(\w+)', text)
-        tags.extend(hashtags)
+        tags = _HASHTAG_RE.findall(text)
 
         # Look for common keywords
-        keywords = {
-            'bug': ['bug', 'error', 'issue'],
-            'refactor': ['refactor', 'cleanup', 'reorganize'],
-            'documentation': ['docs', 'documentation', 'comment'],
-            'testing': ['test', 'testing', 'coverage'],
-            'performance': ['performance', 'optimize', 'speed'],
-            'security': ['security', 'auth', 'permission']
-        }
-
         text_lower = text.lower()
-        for tag, words in keywords.items():
-            if any(word in text_lower for word in words):
+        for tag, keyword_re in _TAG_RULES:
+            if keyword_re.search(text_lower):
                 tags.append(tag)
 
         return list(set(tags))  # Remove duplicates
@@ -275,49 +321,69 @@ class PatternLearner:
     def _group_similar_feedback(self, feedback_items: List[FeedbackItem]) -> List[List[FeedbackItem]]:
         """Group similar feedback items together."""
         groups = []
-        processed = set()
 
+        # Tokenize each item once instead of once per pair
+        features = [self._similarity_features(item) for item in feedback_items]
+
+        # Items of different types are never similar, so only compare within a type
+        by_type: Dict[FeedbackType, List[int]] = {}
         for i, item in enumerate(feedback_items):
-            if i in processed:
-                continue
+            by_type.setdefault(item.type, []).append(i)
 
-            group = [item]
-            processed.add(i)
+        for indices in by_type.values():
+            processed = set()
 
-            # Find similar items
-            for j, other_item in enumerate(feedback_items[i+1:], i+1):
-                if j in processed:
+            for pos, i in enumerate(indices):
+                if i in processed:
                     continue
 
-                if self._are_similar(item, other_item):
-                    group.append(other_item)
-                    processed.add(j)
+                group = [i]
+                processed.add(i)
+
+                # Find similar items
+                for j in indices[pos + 1:]:
+                    if j in processed:
+                        continue
 
-            if len(group) >= 2:  # Only groups with multiple items
-                groups.append(group)
+                    if self._features_similar(features[i], features[j]):
+                        group.append(j)
+                        processed.add(j)
 
-        return groups
+                if len(group) >= 2:  # Only groups with multiple items
+                    groups.append(group)
+
+        # Keep groups in order of their first item, as in a single pass over all items
+        groups.sort(key=lambda group: group[0])
+        return [[feedback_items[i] for i in group] for group in groups]
+
+    def _similarity_features(self, item: FeedbackItem) -> Tuple[FeedbackType, frozenset, frozenset]:
+        """Precompute the type, description words and tags used for similarity."""
+        return item.type, frozenset(item.description.lower().split()), frozenset(item.tags)
 
     def _are_similar(self, item1: FeedbackItem, item2: FeedbackItem) -> bool:
         """Check if two feedback items are similar."""
+        return self._features_similar(self._similarity_features(item1), self._similarity_features(item2))
+
+    def _features_similar(self, features1: Tuple[FeedbackType, frozenset, frozenset],
+                          features2: Tuple[FeedbackType, frozenset, frozenset]) -> bool:
+        """Check if two precomputed similarity feature tuples match."""
+        type1, desc1_words, tags1 = features1
+        type2, desc2_words, tags2 = features2
+
         # Same type
-        if item1.type != item2.type:
+        if type1 != type2:
             return False
 
         # Similar descriptions (simple keyword matching)
-        desc1_words = set(item1.description.lower().split())
-        desc2_words = set(item2.description.lower().split())
-        common_words = desc1_words.intersection(desc2_words)
+        common_words = desc1_words & desc2_words
 
         # At least 30% overlap in words
-        if len(common_words) / max(len(desc1_words), len(desc2_words)) < 0.3:
+        if len(common_words) / (max(len(desc1_words), len(desc2_words)) or 1) < 0.3:
             return False
 
         # Similar tags
-        tags1 = set(item1.tags)
-        tags2 = set(item2.tags)
         if tags1 and tags2:
-            tag_overlap = len(tags1.intersection(tags2)) / len(tags1.union(tags2))
+            tag_overlap = len(tags1 & tags2) / len(tags1 | tags2)
             return tag_overlap >= 0.5
 
         return True
@@ -531,6 +597,12 @@ class FeedbackEngine:
         self.learner = PatternLearner()
         self.logger = logging.getLogger(__name__)
 
+        # Stored feedback keyed by id, with epoch timestamps; loaded lazily
+        self._feedback_cache: Optional[Dict[str, Tuple[FeedbackItem, Optional[float]]]] = None
+
+        # Digest of the last patterns written to or loaded from disk
+        self._last_patterns_digest: Optional[bytes] = None
+
         # Load existing patterns
         self._load_patterns()
 
@@ -636,89 +708,144 @@ class FeedbackEngine:
             confidence_score=confidence_score
         )
 
+    @staticmethod
+    def _feedback_to_dict(item: FeedbackItem) -> Dict[str, Any]:
+        """Convert a feedback item to a JSON-serializable dict."""
+        item_dict = asdict(item)
+        item_dict['type'] = item.type.value
+        item_dict['severity'] = item.severity.value
+        return item_dict
+
+    @staticmethod
+    def _feedback_from_dict(data: Dict[str, Any]) -> FeedbackItem:
+        """Rebuild a feedback item from its JSON dict."""
+        data = dict(data)
+
+        # Convert enum strings back to enums
+        data['type'] = FeedbackType(data['type'])
+        data['severity'] = FeedbackSeverity(data['severity'])
+        return FeedbackItem(**data)
+
     def _store_feedback(self, feedback_items: List[FeedbackItem]):
         """Store feedback items to disk."""
         for item in feedback_items:
             file_path = self.storage_path / 'feedback' / f"{item.id}.json"
             file_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Convert enums to strings for JSON serialization
-            item_dict = asdict(item)
-            item_dict['type'] = item.type.value
-            item_dict['severity'] = item.severity.value
+            file_path.write_bytes(_dumps(self._feedback_to_dict(item), pretty=True))
 
-            with open(file_path, 'w') as f:
-                json.dump(item_dict, f, indent=2)
+            if self._feedback_cache is not None:
+                self._cache_feedback(item)
 
-    def _store_patterns(self):
-        """Store learned patterns to disk."""
-        patterns_file = self.storage_path / 'patterns.json'
+    def _store_feedback_bulk(self, feedback_items: List[FeedbackItem]):
+        """Store a batch of feedback items as one JSONL file."""
+        if not feedback_items:
+            return
+
+        feedback_dir = self.storage_path / 'feedback'
+        feedback_dir.mkdir(parents=True, exist_ok=True)
+        batch_file = feedback_dir / f"batch_{datetime.now().strftime('%Y%m%dT%H%M%S%f')}.jsonl"
+
+        blob = b"".join(_dumps(self._feedback_to_dict(item)) + b"\n" for item in feedback_items)
+        with open(batch_file, 'ab') as f:
+            f.write(blob)
+
+        if self._feedback_cache is not None:
+            for item in feedback_items:
+                self._cache_feedback(item)
+
+    def _serialize_patterns(self) -> bytes:
+        """Serialize learned patterns as they are written to disk."""
         patterns_data = {
             pattern_id: asdict(pattern)
             for pattern_id, pattern in self.learner.patterns.items()
         }
+        return _dumps(patterns_data, pretty=True)
 
-        with open(patterns_file, 'w') as f:
-            json.dump(patterns_data, f, indent=2)
+    def _store_patterns(self):
+        """Store learned patterns to disk, skipping the write if nothing changed."""
+        patterns_file = self.storage_path / 'patterns.json'
+        payload = self._serialize_patterns()
+        digest = hashlib.blake2b(payload, digest_size=16).digest()
+
+        if digest == self._last_patterns_digest and patterns_file.exists():
+            return
+
+        patterns_file.write_bytes(payload)
+        self._last_patterns_digest = digest
+
+    @staticmethod
+    def _deserialize_patterns(blob: bytes) -> Dict[str, FeedbackPattern]:
+        """Rebuild learned patterns from serialized pattern JSON."""
+        return {
+            pattern_id: FeedbackPattern(**pattern_dict)
+            for pattern_id, pattern_dict in _loads(blob).items()
+        }
 
     def _load_patterns(self):
         """Load patterns from disk."""
         patterns_file = self.storage_path / 'patterns.json'
         if patterns_file.exists():
             try:
-                with open(patterns_file, 'r') as f:
-                    patterns_data = json.load(f)
-
-                for pattern_id, pattern_dict in patterns_data.items():
-                    pattern = FeedbackPattern(**pattern_dict)
-                    self.learner.patterns[pattern_id] = pattern
-
+                self.learner.patterns.update(self._deserialize_patterns(patterns_file.read_bytes()))
+                self._last_patterns_digest = hashlib.blake2b(self._serialize_patterns(), digest_size=16).digest()
                 self.logger.info(f"Loaded {len(self.learner.patterns)} patterns")
             except Exception as e:
                 self.logger.warning(f"Failed to load patterns: {e}")
 
     def _load_recent_feedback(self, cutoff_date: datetime) -> List[FeedbackItem]:
         """Load feedback items from the last N days."""
-        feedback_items = []
-        feedback_dir = self.storage_path / 'feedback'
+        cutoff = cutoff_date.timestamp()
 
-        if not feedback_dir.exists():
-            return feedback_items
+        # Items whose timestamp could not be parsed are always included
+        return [
+            item for item, item_epoch in self._get_feedback_cache().values()
+            if item_epoch is None or item_epoch >= cutoff
+        ]
 
-        for feedback_file in feedback_dir.glob('*.json'):
+    def _get_feedback_cache(self) -> Dict[str, Tuple[FeedbackItem, Optional[float]]]:
+        """Return stored feedback, scanning the feedback directory on first use."""
+        if self._feedback_cache is None:
+            self._feedback_cache = {}
+            feedback_dir = self.storage_path / 'feedback'
+            if feedback_dir.exists():
+                for feedback_file, raw in self._iter_feedback_records(feedback_dir):
+                    try:
+                        self._cache_feedback(self._feedback_from_dict(_loads(raw)))
+                    except Exception as e:
+                        self.logger.warning(f"Failed to load feedback from {feedback_file}: {e}")
+
+        return self._feedback_cache
+
+    def _cache_feedback(self, item: FeedbackItem):
+        """Record a stored feedback item and its epoch timestamp in the cache."""
+        # Naive timestamps are local time, matching datetime.now() cutoffs
+        try:
+            item_timestamp = item.timestamp.replace('Z', '+00:00') if 'Z' in item.timestamp else item.timestamp
+            item_epoch = datetime.fromisoformat(item_timestamp).timestamp()
+        except Exception:
+            item_epoch = None
+
+        self._feedback_cache[item.id] = (item, item_epoch)
+
+    def _iter_feedback_records(self, feedback_dir: Path):
+        """Yield (source, raw JSON bytes) pairs from JSONL batches, then legacy per-item files."""
+        for batch_file in feedback_dir.glob('*.jsonl'):
             try:
-                with open(feedback_file, 'r') as f:
-                    data = json.load(f)
-
-                # Convert enum strings back to enums
-                data['type'] = FeedbackType(data['type'])
-                data['severity'] = FeedbackSeverity(data['severity'])
-
-                item = FeedbackItem(**data)
-                # Handle timezone-aware/naive datetime comparison
-                try:
-                    item_timestamp = item.timestamp.replace('Z', '+00:00') if 'Z' in item.timestamp else item.timestamp
-                    item_date = datetime.fromisoformat(item_timestamp)
-
-                    # Make cutoff_date timezone-aware if item_date is timezone-aware
-                    if item_date.tzinfo is not None and cutoff_date.tzinfo is None:
-                        import datetime as dt
-                        cutoff_date = cutoff_date.replace(tzinfo=dt.timezone.utc)
-                    elif item_date.tzinfo is None and cutoff_date.tzinfo is not None:
-                        cutoff_date = cutoff_date.replace(tzinfo=None)
-
-                except Exception:
-                    # If datetime parsing fails, include the item
-                    item_date = cutoff_date
-
-                if item_date >= cutoff_date:
-                    feedback_items.append(item)
+                lines = batch_file.read_bytes().splitlines()
+            except OSError as e:
+                self.logger.warning(f"Failed to load feedback from {batch_file}: {e}")
+                continue
+            for line in lines:
+                if line:
+                    yield batch_file, line
 
-            except Exception as e:
+        for feedback_file in feedback_dir.glob('*.json'):
+            try:
+                yield feedback_file, feedback_file.read_bytes()
+            except OSError as e:
                 self.logger.warning(f"Failed to load feedback from {feedback_file}: {e}")
 
-        return feedback_items
-
     def _generate_improvement_suggestions(self, recent_feedback: List[FeedbackItem],
                                         top_patterns: List[FeedbackPattern]) -> List[str]:
         """Generate improvement suggestions based on feedback and patterns."""
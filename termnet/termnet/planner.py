@@ -12,7 +12,7 @@ from dataclasses import dataclass, asdict
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class TestCaseSpec:
     """Specification for a test case to validate task completion."""
     name: str
@@ -22,7 +22,7 @@ class TestCaseSpec:
     risk_level: str = "low"
 
 
-@dataclass
+@dataclass(slots=True)
 class TaskNode:
     """A single task in the execution plan."""
     id: str
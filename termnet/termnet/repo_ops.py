@@ -6,6 +6,7 @@ Designed for autonomous code changes with comprehensive safety checks.
 """
 
 import os
+import shutil
 import subprocess
 import tempfile
 import json
@@ -14,6 +15,18 @@ from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
+try:
+    import orjson  # optional, faster parsing of gh --json output
+except ImportError:
+    orjson = None
+
+
+def _loads(data: str) -> Any:
+    """Deserialize JSON text, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 @dataclass
 class GitResult:
@@ -64,7 +77,9 @@ class GitClient:
             "max_commit_size": 1000000,  # 1MB
             "require_clean_working_tree": True,
             "auto_push": False,
-            "sign_commits": False
+            "sign_commits": False,
+            # Resolved once per client so each command skips the $PATH lookup
+            "git_binary": shutil.which("git") or "git"
         }
 
         for key, value in defaults.items():
@@ -82,7 +97,7 @@ class GitClient:
         Returns:
             GitResult with command output and status
         """
-        cmd = ["git"] + args
+        cmd = [self.config["git_binary"]] + args
 
         try:
             result = subprocess.run(
@@ -449,7 +464,7 @@ class PRClient:
             return None
 
         try:
-            data = json.loads(result.stdout)
+            data = _loads(result.stdout)
             return PRInfo(
                 number=data["number"],
                 title=data["title"],
@@ -2,13 +2,21 @@
 Shared fixtures for TermNet tests
 """
 
+import json
 import os
+import shutil
+import subprocess
 import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock
 
 import pytest
 
+try:
+    import fcntl  # POSIX only; results logging falls back to per-worker files
+except ImportError:
+    fcntl = None
+
 
 @pytest.fixture
 def mock_terminal():
@@ -57,6 +65,40 @@ def temp_dir():
         yield Path(tmp_dir)
 
 
+# git init, identity config and the initial README commit batched into a single spawn
+_INIT_REPO_CMD = (
+    "git init -q"
+    " && git config user.name 'Test User'"
+    " && git config user.email test@example.com"
+    " && echo '# Test Repository' > README.md"
+    " && git add README.md"
+    " && git -c commit.gpgsign=false commit -q -m 'Initial commit'"
+)
+
+
+# Scratch repos go on tmpfs when available so git's object/index writes stay in RAM
+_SCRATCH_ROOT = "/dev/shm" if os.access("/dev/shm", os.W_OK) else None
+
+
+@pytest.fixture(scope="session")
+def _git_template(tmp_path_factory):
+    """Build the baseline repository once; tests get private copies of it."""
+    if shutil.which("git") is None:
+        pytest.skip("git not installed")
+    template = tmp_path_factory.mktemp("git_template")
+    subprocess.run(_INIT_REPO_CMD, shell=True, cwd=template, check=True, executable="/bin/bash")
+    return template
+
+
+@pytest.fixture
+def temp_git_repo(_git_template):
+    """Create a temporary git repository copied from the session template."""
+    with tempfile.TemporaryDirectory(dir=_SCRATCH_ROOT) as temp_dir:
+        repo_path = Path(temp_dir)
+        shutil.copytree(_git_template, repo_path, dirs_exist_ok=True)
+        yield repo_path
+
+
 @pytest.fixture
 def mock_agent():
     """Mock agent for testing agent interactions"""
@@ -164,3 +206,84 @@ def pytest_collection_modifyitems(config, items):
                         strict=False,
                     )
                 )
+
+
+# Per-test results: workers append one JSON line to a results log as each test
+# finishes, and the controller folds the logs into the results.json array at the end.
+# All writers share RESULTS_LOG under flock; without fcntl (Windows) each writer
+# gets its own .pytest_results.<worker>.jsonl instead.
+RESULTS_PATH = Path(os.environ.get("TERMNET_TEST_RESULTS", "results.json"))
+RESULTS_LOG = RESULTS_PATH.with_name(".pytest_results.jsonl")
+_RESULTS_LOG_GLOB = ".pytest_results*.jsonl"
+_results_enabled = True
+_results_log = RESULTS_LOG
+
+
+def pytest_sessionstart(session):
+    """Start each run with fresh results files and pick the writer.
+
+    Under xdist the controller re-dispatches every worker report, so only the
+    workers (or a plain, non-distributed run) write to avoid duplicates.
+    """
+    global _results_enabled, _results_log
+    config = session.config
+    is_worker = hasattr(config, "workerinput")
+    _results_enabled = is_worker or not config.pluginmanager.hasplugin("dsession")
+    if fcntl is None:
+        worker_id = config.workerinput["workerid"] if is_worker else "main"
+        _results_log = RESULTS_PATH.with_name(f".pytest_results.{worker_id}.jsonl")
+    if not is_worker:
+        RESULTS_PATH.unlink(missing_ok=True)
+        for log_path in RESULTS_PATH.parent.glob(_RESULTS_LOG_GLOB):
+            log_path.unlink(missing_ok=True)
+
+
+def pytest_runtest_logreport(report):
+    """Append the test's outcome to the results log.
+
+    Call reports are always recorded; setup reports only when the test was
+    skipped or errored there, since it then never reaches the call phase.
+    """
+    if not _results_enabled:
+        return
+    if report.when != "call" and not (report.when == "setup" and report.outcome != "passed"):
+        return
+
+    line = json.dumps(
+        {
+            "nodeid": report.nodeid,
+            "when": report.when,
+            "outcome": report.outcome,
+            "duration": report.duration,
+        }
+    )
+    with open(_results_log, "a", encoding="utf-8") as log:
+        if fcntl is None:
+            log.write(line + "\n")
+            return
+        # flock is tied to the open descriptor, so a killed worker cannot leave it held
+        fcntl.flock(log, fcntl.LOCK_EX)
+        try:
+            log.write(line + "\n")
+            log.flush()
+        finally:
+            fcntl.flock(log, fcntl.LOCK_UN)
+
+
+def pytest_sessionfinish(session):
+    """Fold the per-test results logs into results.json (controller only)."""
+    if hasattr(session.config, "workerinput"):
+        return
+    log_paths = sorted(RESULTS_PATH.parent.glob(_RESULTS_LOG_GLOB))
+    if not log_paths:
+        return
+
+    data = []
+    for log_path in log_paths:
+        with open(log_path, encoding="utf-8") as log:
+            data.extend(json.loads(line) for line in log if line.strip())
+    tmp = RESULTS_PATH.with_name(RESULTS_PATH.name + ".tmp")
+    tmp.write_text(json.dumps(data))
+    os.replace(tmp, RESULTS_PATH)
+    for log_path in log_paths:
+        log_path.unlink(missing_ok=True)
@@ -3,11 +3,37 @@ Smoke test for BrokenPipe guard in autopilot output.
 Ensures piping to head doesn't crash.
 """
 
+import os
 import subprocess
 import sys
 import unittest
 
+import pytest
 
+from termnet.cli import main
+
+
+class TestBrokenPipeGuardInProcess:
+    """Test the BrokenPipe guard without spawning any processes."""
+
+    def test_status_to_closed_pipe_no_crash(self, monkeypatch):
+        """Test: `status` writing into a pipe whose reader has gone away."""
+        read_fd, write_fd = os.pipe()
+        os.close(read_fd)
+        stdout = os.fdopen(write_fd, "w", buffering=1)
+        monkeypatch.setattr(sys, "stdout", stdout)
+
+        try:
+            # No BrokenPipeError traceback, but a failing exit status
+            with pytest.raises(SystemExit) as exc_info:
+                main(["status"])
+            assert exc_info.value.code == 1
+        finally:
+            monkeypatch.undo()
+            stdout.close()
+
+
+@pytest.mark.slow
 class TestBrokenPipeGuard(unittest.TestCase):
     """Test that piping autopilot output doesn't crash on BrokenPipe."""
 
@@ -37,9 +63,9 @@ class TestBrokenPipeGuard(unittest.TestCase):
 
         # Assert head got output and tn didn't crash
         self.assertIn("📊 Autopilot status: Ready", stdout)
-        # tn may exit with SIGPIPE (141) or clean exit (0), both acceptable
-        self.assertIn(tn_proc.returncode, [0, 141, -13])  # 0=clean, 141=SIGPIPE, -13=SIGPIPE on some systems
+        # tn may finish before head closes (0), hit the BrokenPipe guard (1), or die of SIGPIPE
+        self.assertIn(tn_proc.returncode, [0, 1, 141, -13])  # 141/-13=SIGPIPE depending on system
 
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
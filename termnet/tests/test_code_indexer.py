@@ -6,12 +6,12 @@ Follows Google AI best practices for isolated, reproducible testing.
 """
 
 import os
-import tempfile
 import shutil
 import pytest
 from pathlib import Path
 from unittest.mock import patch
 
+from termnet import code_indexer
 from termnet.code_indexer import CodeIndexer, CodeSymbol, SearchResult
 
 
@@ -19,22 +19,18 @@ class TestCodeIndexer:
     """Test CodeIndexer functionality with offline fixtures."""
 
     @pytest.fixture
-    def temp_repo(self):
+    def temp_repo(self, tmp_path):
         """Create temporary repository with test files."""
-        temp_dir = tempfile.mkdtemp()
-        old_cwd = os.getcwd()
+        temp_dir = tmp_path
 
-        try:
-            os.chdir(temp_dir)
+        # Create test Python files
+        os.makedirs(temp_dir / "src", exist_ok=True)
+        os.makedirs(temp_dir / "tests", exist_ok=True)
+        os.makedirs(temp_dir / "docs", exist_ok=True)
 
-            # Create test Python files
-            os.makedirs("src", exist_ok=True)
-            os.makedirs("tests", exist_ok=True)
-            os.makedirs("docs", exist_ok=True)
-
-            # Main module
-            with open("src/main.py", "w") as f:
-                f.write('''"""Main module for testing."""
+        # Main module
+        with open(temp_dir / "src/main.py", "w") as f:
+            f.write('''"""Main module for testing."""
 import os
 from typing import List, Optional
 
@@ -73,9 +69,9 @@ if __name__ == "__main__":
     main_function()
 ''')
 
-            # Utility module
-            with open("src/utils.py", "w") as f:
-                f.write('''"""Utility functions."""
+        # Utility module
+        with open(temp_dir / "src/utils.py", "w") as f:
+            f.write('''"""Utility functions."""
 import json
 import re
 from pathlib import Path
@@ -101,9 +97,9 @@ class ConfigManager:
         self.config_data = read_config(str(path))
 ''')
 
-            # Test file
-            with open("tests/test_main.py", "w") as f:
-                f.write('''"""Tests for main module."""
+        # Test file
+        with open(temp_dir / "tests/test_main.py", "w") as f:
+            f.write('''"""Tests for main module."""
 import pytest
 from src.main import DataProcessor, main_function
 
@@ -134,9 +130,9 @@ def test_main_function():
     main_function()
 ''')
 
-            # Documentation
-            with open("docs/README.md", "w") as f:
-                f.write('''# Test Project
+        # Documentation
+        with open(temp_dir / "docs/README.md", "w") as f:
+            f.write('''# Test Project
 
 This is a test project for code indexing.
 
@@ -164,9 +160,9 @@ pytest tests/
 ```
 ''')
 
-            # JavaScript file for multi-language testing
-            with open("src/app.js", "w") as f:
-                f.write('''// JavaScript application
+        # JavaScript file for multi-language testing
+        with open(temp_dir / "src/app.js", "w") as f:
+            f.write('''// JavaScript application
 const express = require('express');
 
 function createApp() {
@@ -202,23 +198,19 @@ class APIClient {
 module.exports = { createApp, APIClient, handleError };
 ''')
 
-            yield temp_dir
-
-        finally:
-            os.chdir(old_cwd)
-            shutil.rmtree(temp_dir)
+        return temp_dir
 
     @pytest.fixture
-    def indexer(self):
+    def indexer(self, temp_repo):
         """Create code indexer instance."""
-        return CodeIndexer(cache_dir=".test_cache")
+        return CodeIndexer(cache_dir=str(temp_repo / ".test_cache"))
 
     def test_build_index_finds_files(self, indexer, temp_repo):
         """Test that build_index correctly finds and indexes files."""
         include_globs = ["*.py", "*.md", "*.js"]
         exclude_globs = ["__pycache__/*", ".git/*"]
 
-        repo_intel = indexer.build_index(include_globs, exclude_globs)
+        repo_intel = indexer.build_index(include_globs, exclude_globs, root=temp_repo)
 
         # Verify file discovery
         assert "files" in repo_intel
@@ -237,7 +229,7 @@ module.exports = { createApp, APIClient, handleError };
 
     def test_extract_python_symbols(self, indexer, temp_repo):
         """Test extraction of Python symbols."""
-        repo_intel = indexer.build_index(["*.py"])
+        repo_intel = indexer.build_index(["*.py"], root=temp_repo)
 
         symbols = repo_intel["symbols"]
 
@@ -266,7 +258,7 @@ module.exports = { createApp, APIClient, handleError };
 
     def test_extract_imports(self, indexer, temp_repo):
         """Test extraction of import statements."""
-        repo_intel = indexer.build_index(["*.py"])
+        repo_intel = indexer.build_index(["*.py"], root=temp_repo)
 
         imports = repo_intel["imports"]
 
@@ -282,9 +274,51 @@ module.exports = { createApp, APIClient, handleError };
         assert "re" in utils_imports
         assert "Path" in utils_imports
 
+    def test_nested_functions_skipped_but_lazy_imports_kept(self, indexer, temp_repo):
+        """Test that function bodies yield their imports but not nested defs."""
+        with open(temp_repo / "src/lazy.py", "w") as f:
+            f.write(
+                "def outer():\n"
+                "    import sqlite3\n"
+                "    def _inner_helper():\n"
+                "        pass\n"
+                "    return _inner_helper\n"
+            )
+
+        repo_intel = indexer.build_index(["*.py"], root=temp_repo)
+
+        assert "outer" in repo_intel["symbols"]
+        assert "_inner_helper" not in repo_intel["symbols"]
+        assert repo_intel["imports"]["src/lazy.py"] == ["sqlite3"]
+
+    def test_python_symbols_fall_back_to_regex_on_syntax_error(self, indexer, temp_repo):
+        """Test that unparsable Python still yields regex-extracted symbols."""
+        with open(temp_repo / "src/legacy.py", "w") as f:
+            f.write("import os\n\ndef legacy_func(x):\n    print 'py2 only'\n")
+
+        repo_intel = indexer.build_index(["*.py"], root=temp_repo)
+
+        assert "legacy_func" in repo_intel["symbols"]
+        assert "os" in repo_intel["imports"]["src/legacy.py"]
+
+        # Parsable files get docstrings from the AST
+        symbol = indexer.symbols["src/main.py:DataProcessor"]
+        assert symbol.docstring == "Processes data for the application."
+
+    def test_python_symbols_fall_back_to_regex_on_deep_nesting(self, indexer, temp_repo):
+        """Test that code too deeply nested for ast.parse is still indexed."""
+        with open(temp_repo / "src/generated.py", "w") as f:
+            f.write("import os\n\ndef generated_func():\n    return 1" + " + 1" * 100000 + "\n")
+
+        repo_intel = indexer.build_index(["*.py"], root=temp_repo)
+
+        assert "src/generated.py" in repo_intel["files"]
+        assert "generated_func" in repo_intel["symbols"]
+        assert repo_intel["imports"]["src/generated.py"] == ["os"]
+
     def test_code_search_symbol_names(self, indexer, temp_repo):
         """Test searching for symbols by name."""
-        indexer.build_index(["*.py"])
+        indexer.build_index(["*.py"], root=temp_repo)
 
         # Search for exact class name
         results = indexer.code_search("DataProcessor")
@@ -306,7 +340,7 @@ module.exports = { createApp, APIClient, handleError };
 
     def test_code_search_content(self, indexer, temp_repo):
         """Test searching within file content."""
-        indexer.build_index(["*.py", "*.md"])
+        indexer.build_index(["*.py", "*.md"], root=temp_repo)
 
         # Search for content in comments/docstrings
         results = indexer.code_search("configuration")
@@ -323,7 +357,7 @@ module.exports = { createApp, APIClient, handleError };
 
     def test_who_refs_finds_references(self, indexer, temp_repo):
         """Test finding references to symbols."""
-        indexer.build_index(["*.py"])
+        indexer.build_index(["*.py"], root=temp_repo)
 
         # Find references to DataProcessor
         refs = indexer.who_refs("DataProcessor")
@@ -336,7 +370,7 @@ module.exports = { createApp, APIClient, handleError };
 
     def test_impact_analysis_files(self, indexer, temp_repo):
         """Test impact analysis for file changes."""
-        indexer.build_index(["*.py"])
+        indexer.build_index(["*.py"], root=temp_repo)
 
         # Analyze impact of changing main.py
         impact = indexer.impact(["src/main.py"])
@@ -352,7 +386,7 @@ module.exports = { createApp, APIClient, handleError };
 
     def test_impact_analysis_symbols(self, indexer, temp_repo):
         """Test impact analysis for symbol changes."""
-        indexer.build_index(["*.py"])
+        indexer.build_index(["*.py"], root=temp_repo)
 
         # Analyze impact of changing DataProcessor
         impact = indexer.impact(["DataProcessor"])
@@ -364,17 +398,18 @@ module.exports = { createApp, APIClient, handleError };
     def test_exclude_patterns_work(self, indexer, temp_repo):
         """Test that exclude patterns properly filter files."""
         # Create files that should be excluded
-        os.makedirs("__pycache__", exist_ok=True)
-        with open("__pycache__/test.pyc", "w") as f:
+        os.makedirs(temp_repo / "__pycache__", exist_ok=True)
+        with open(temp_repo / "__pycache__/test.pyc", "w") as f:
             f.write("binary content")
 
-        os.makedirs("node_modules", exist_ok=True)
-        with open("node_modules/package.js", "w") as f:
+        os.makedirs(temp_repo / "node_modules", exist_ok=True)
+        with open(temp_repo / "node_modules/package.js", "w") as f:
             f.write("console.log('should be excluded');")
 
         repo_intel = indexer.build_index(
             ["*.py", "*.js"],
-            ["__pycache__/*", "node_modules/*"]
+            ["__pycache__/*", "node_modules/*"],
+            root=temp_repo
         )
 
         files = repo_intel["files"]
@@ -385,19 +420,60 @@ module.exports = { createApp, APIClient, handleError };
     def test_max_file_size_limit(self, indexer, temp_repo):
         """Test that large files are excluded."""
         # Create a large file
-        with open("large_file.py", "w") as f:
+        with open(temp_repo / "large_file.py", "w") as f:
             f.write("# Large file\n" * 10000)  # Make it large
 
         # Use small max_file_size
-        small_indexer = CodeIndexer(max_file_size=1000)
-        repo_intel = small_indexer.build_index(["*.py"])
+        small_indexer = CodeIndexer(max_file_size=1000, cache_dir=str(temp_repo / ".test_cache"))
+        repo_intel = small_indexer.build_index(["*.py"], root=temp_repo)
 
         # Large file should not be indexed
         assert "large_file.py" not in repo_intel["files"]
 
+    def test_data_only_file_is_indexed_without_symbols(self, indexer, temp_repo):
+        """Test that files with no definitions skip parsing but stay searchable."""
+        with open(temp_repo / "src/constants.py", "w") as f:
+            f.write("TIMEOUT_SECONDS = 30\nRETRY_LIMIT = 5\n")
+
+        repo_intel = indexer.build_index(["*.py"], root=temp_repo)
+
+        assert "src/constants.py" in repo_intel["files"]
+        assert not any(key.startswith("src/constants.py:") for key in indexer.symbols)
+        assert "src/constants.py" in indexer.word_index["timeout_seconds"]
+
+    def test_parallel_index_matches_serial(self, temp_repo):
+        """Test that the process-pool path builds the same index as the serial one."""
+        serial = CodeIndexer(cache_dir=str(temp_repo / ".test_cache"), parallel=False)
+        serial_intel = serial.build_index(["*.py", "*.js"], root=temp_repo)
+
+        # Separate cache so every file is a miss and goes through the pool
+        with patch("termnet.code_indexer._PARALLEL_MIN_FILES", 0), \
+                patch("termnet.code_indexer.os.cpu_count", return_value=2):
+            pooled = CodeIndexer(cache_dir=str(temp_repo / ".pool_cache"))
+            pooled_intel = pooled.build_index(["*.py", "*.js"], root=temp_repo)
+
+        assert pooled_intel["files"] == serial_intel["files"]
+        assert pooled_intel["symbols"] == serial_intel["symbols"]
+        assert pooled_intel["imports"] == serial_intel["imports"]
+        assert pooled.line_index == serial.line_index
+        assert pooled.symbols == serial.symbols
+
+    def test_warm_build_skips_process_pool(self, indexer, temp_repo):
+        """Test that cache hits are resolved in-process and only misses reach the pool."""
+        indexer.build_index(["*.py"], root=temp_repo)
+
+        rebuilt = CodeIndexer(cache_dir=str(temp_repo / ".test_cache"))
+        with patch("termnet.code_indexer._PARALLEL_MIN_FILES", 1), \
+                patch("termnet.code_indexer.os.cpu_count", return_value=2), \
+                patch("termnet.code_indexer.ProcessPoolExecutor") as pool:
+            rebuilt.build_index(["*.py"], root=temp_repo)
+
+        pool.assert_not_called()
+        assert rebuilt.symbols == indexer.symbols
+
     def test_search_relevance_scoring(self, indexer, temp_repo):
         """Test that search results are properly scored and ranked."""
-        indexer.build_index(["*.py"])
+        indexer.build_index(["*.py"], root=temp_repo)
 
         # Search for "process" - should find multiple matches
         results = indexer.code_search("process")
@@ -416,7 +492,7 @@ module.exports = { createApp, APIClient, handleError };
 
     def test_javascript_symbol_extraction(self, indexer, temp_repo):
         """Test extraction of JavaScript symbols."""
-        repo_intel = indexer.build_index(["*.js"])
+        repo_intel = indexer.build_index(["*.js"], root=temp_repo)
 
         symbols = repo_intel["symbols"]
 
@@ -429,7 +505,7 @@ module.exports = { createApp, APIClient, handleError };
 
     def test_repo_intel_structure(self, indexer, temp_repo):
         """Test that repo_intel has expected structure."""
-        repo_intel = indexer.build_index(["*.py", "*.md", "*.js"])
+        repo_intel = indexer.build_index(["*.py", "*.md", "*.js"], root=temp_repo)
 
         # Check required fields
         required_fields = [
@@ -457,7 +533,7 @@ module.exports = { createApp, APIClient, handleError };
     def test_cache_functionality(self, indexer, temp_repo):
         """Test index caching and loading."""
         # Build index first time
-        repo_intel1 = indexer.build_index(["*.py"])
+        repo_intel1 = indexer.build_index(["*.py"], root=temp_repo)
 
         # Load from cache
         cached_intel = indexer.load_cached_index()
@@ -466,15 +542,127 @@ module.exports = { createApp, APIClient, handleError };
             assert cached_intel["index_timestamp"] == repo_intel1["index_timestamp"]
             assert len(cached_intel["files"]) == len(repo_intel1["files"])
 
+    def test_code_search_content_spanning_tokens(self, indexer, temp_repo):
+        """Test that content queries crossing word boundaries still match via postings."""
+        indexer.build_index(["*.py"], root=temp_repo)
+
+        results = indexer.code_search("item.UPPER")
+
+        assert [(r.file_path, r.line_number) for r in results] == [("src/main.py", 27)]
+        assert results[0].snippet == "return item.upper().strip()"
+
+    def test_content_relevance_after_reindex(self, indexer, temp_repo):
+        """Test that content scores follow the current file, not stale postings."""
+        with open(temp_repo / "src/notes.py", "w") as f:
+            f.write("alpha_marker = beta_marker\n")
+        indexer.build_index(["*.py"], root=temp_repo)
+        assert indexer.code_search("alpha_marker = beta_marker")[0].relevance_score == 1.0
+
+        with open(temp_repo / "src/notes.py", "w") as f:
+            f.write("alpha_marker = 1\n\n\nbeta_marker_old = 2\n")
+        indexer.build_index(["*.py"], root=temp_repo)
+
+        results = indexer.code_search("alpha_marker")
+        assert [(r.line_number, r.relevance_score) for r in results] == [(1, 1.0)]
+        assert "src/notes.py" not in indexer.postings["beta_marker"]
+        assert indexer.code_search("alpha_marker = beta_marker") == []
+
+    def test_query_cache_invalidated_on_rebuild(self, indexer, temp_repo):
+        """Test that repeated queries are memoized until the index is rebuilt."""
+        indexer.build_index(["*.py"], root=temp_repo)
+        first = indexer.code_search("late_arrival")
+        indexer.code_search("late_arrival")
+        assert indexer._code_search_cached.cache_info().hits == 1
+        assert first == []
+
+        with open(temp_repo / "src/late.py", "w") as f:
+            f.write("def late_arrival():\n    pass\n")
+        indexer.build_index(["*.py"], root=temp_repo)
+
+        assert any(r.file_path == "src/late.py" for r in indexer.code_search("late_arrival"))
+        assert "src/late.py" in indexer.who_refs("late_arrival")
+
+    def test_file_cache_skips_unchanged_files(self, indexer, temp_repo):
+        """Test that a rebuild reuses cached parse results for unchanged files."""
+        first_intel = indexer.build_index(["*.py"], root=temp_repo)
+
+        with open(temp_repo / "src/utils.py", "a") as f:
+            f.write("\ndef added_later():\n    pass\n")
+
+        rebuilt = CodeIndexer(cache_dir=str(temp_repo / ".test_cache"), parallel=False)
+        with patch("termnet.code_indexer._extract_python_symbols",
+                   wraps=code_indexer._extract_python_symbols) as extract:
+            second_intel = rebuilt.build_index(["*.py"], root=temp_repo)
+
+        parsed = [call.args[0] for call in extract.call_args_list]
+        assert parsed == ["src/utils.py"]
+        assert second_intel["files"] == first_intel["files"]
+        assert "added_later" in second_intel["symbols"]
+        assert rebuilt.symbols["src/main.py:DataProcessor"] == indexer.symbols["src/main.py:DataProcessor"]
+
+    def test_file_cache_survives_touch(self, indexer, temp_repo):
+        """Test that a file whose mtime changed but content did not is not re-parsed."""
+        indexer.build_index(["*.py"], root=temp_repo)
+        stat = os.stat(temp_repo / "src/main.py")
+        os.utime(temp_repo / "src/main.py", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        rebuilt = CodeIndexer(cache_dir=str(temp_repo / ".test_cache"), parallel=False)
+        with patch("termnet.code_indexer._extract_python_symbols") as extract:
+            rebuilt.build_index(["*.py"], root=temp_repo)
+
+        extract.assert_not_called()
+        assert rebuilt.symbols["src/main.py:DataProcessor"] == indexer.symbols["src/main.py:DataProcessor"]
+
+    def test_file_cache_not_shared_across_roots(self, indexer, temp_repo, tmp_path):
+        """Test that a copied tree with equal paths, sizes and mtimes is parsed afresh."""
+        indexer.build_index(["*.py"], root=temp_repo)
+        copy_root = tmp_path / "copy"
+        shutil.copytree(temp_repo / "src", copy_root / "src")
+        main_py = copy_root / "src/main.py"
+        stat = os.stat(main_py)
+        main_py.write_text(main_py.read_text().replace("class DataProcessor", "class DataProcessXr"))
+        os.utime(main_py, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        rebuilt = CodeIndexer(cache_dir=str(temp_repo / ".test_cache"), parallel=False)
+        rebuilt.build_index(["*.py"], root=copy_root)
+
+        assert "src/main.py:DataProcessXr" in rebuilt.symbols
+        assert "src/main.py:DataProcessor" not in rebuilt.symbols
+
+    def test_file_cache_not_rewritten_when_unchanged(self, indexer, temp_repo):
+        """Test that a rebuild with no changed files leaves the cache file alone."""
+        indexer.build_index(["*.py"], root=temp_repo)
+        cache_file = indexer._file_cache_path(str(temp_repo))
+        os.utime(cache_file, ns=(0, 0))
+
+        rebuilt = CodeIndexer(cache_dir=str(temp_repo / ".test_cache"), parallel=False)
+        rebuilt.build_index(["*.py"], root=temp_repo)
+        assert os.stat(cache_file).st_mtime_ns == 0
+
+        with open(temp_repo / "src/utils.py", "a") as f:
+            f.write("\ndef added_later():\n    pass\n")
+        rebuilt.build_index(["*.py"], root=temp_repo)
+        assert os.stat(cache_file).st_mtime_ns != 0
+
+    def test_paths_shared_across_index_structures(self, indexer, temp_repo):
+        """Test that cached symbols and word sets reuse one str per file path."""
+        indexer.build_index(["*.py"], root=temp_repo)
+        rebuilt = CodeIndexer(cache_dir=str(temp_repo / ".test_cache"), parallel=False)
+        rebuilt.build_index(["*.py"], root=temp_repo)
+
+        path = next(p for p in rebuilt.line_index if p == "src/main.py")
+        assert rebuilt.symbols["src/main.py:DataProcessor"].file_path is path
+        assert next(p for p in rebuilt.word_index["dataprocessor"] if p == path) is path
+
     def test_error_handling_bad_files(self, indexer, temp_repo):
         """Test error handling for problematic files."""
         # Create a file with encoding issues
-        with open("bad_encoding.py", "wb") as f:
+        with open(temp_repo / "bad_encoding.py", "wb") as f:
             f.write(b"# -*- coding: utf-8 -*-\n")
             f.write(b"print('\xff\xfe bad encoding')\n")
 
         # Should handle gracefully and continue indexing
-        repo_intel = indexer.build_index(["*.py"])
+        repo_intel = indexer.build_index(["*.py"], root=temp_repo)
 
         # Should still index other files
         assert len(repo_intel["files"]) > 0
@@ -482,7 +670,7 @@ module.exports = { createApp, APIClient, handleError };
 
     def test_word_index_building(self, indexer, temp_repo):
         """Test that word index is built correctly."""
-        indexer.build_index(["*.py"])
+        indexer.build_index(["*.py"], root=temp_repo)
 
         # Check that word index is populated
         assert len(indexer.word_index) > 0
@@ -499,7 +687,7 @@ module.exports = { createApp, APIClient, handleError };
 
     def test_line_index_accuracy(self, indexer, temp_repo):
         """Test that line indexing is accurate."""
-        indexer.build_index(["*.py"])
+        indexer.build_index(["*.py"], root=temp_repo)
 
         # Check specific file
         main_lines = indexer.line_index.get("src/main.py", [])
@@ -510,21 +698,30 @@ module.exports = { createApp, APIClient, handleError };
         assert "class DataProcessor:" in content
         assert "def process_data" in content
 
-    def test_empty_repository(self, indexer):
+    def test_line_index_matches_splitlines(self, indexer, temp_repo):
+        """Test that lazily sliced lines behave like str.splitlines()."""
+        text = "first\r\nsecond\x0cthird\n\nlast"
+        with open(temp_repo / "src/breaks.py", "w", newline="") as f:
+            f.write(text)
+
+        indexer.build_index(["*.py"], root=temp_repo)
+        lines = indexer.line_index["src/breaks.py"]
+
+        expected = "first\nsecond\x0cthird\n\nlast".splitlines()
+        assert list(lines) == expected
+        assert lines == expected
+        assert lines[-1] == "last"
+        assert lines[1:3] == expected[1:3]
+
+    def test_empty_repository(self, indexer, tmp_path_factory):
         """Test behavior with empty repository."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            old_cwd = os.getcwd()
-            try:
-                os.chdir(temp_dir)
-                repo_intel = indexer.build_index(["*.py"])
-
-                assert repo_intel["files"] == []
-                assert repo_intel["symbols"] == []
-                assert repo_intel["total_lines"] == 0
-                assert len(repo_intel["imports"]) == 0
-
-            finally:
-                os.chdir(old_cwd)
+        empty_repo = tmp_path_factory.mktemp("empty_repo")
+        repo_intel = indexer.build_index(["*.py"], root=empty_repo)
+
+        assert repo_intel["files"] == []
+        assert repo_intel["symbols"] == []
+        assert repo_intel["total_lines"] == 0
+        assert len(repo_intel["imports"]) == 0
 
 
 class TestCodeSymbol:
@@ -102,6 +102,48 @@ class TestEditEngine:
         assert result2.idempotent == True
         assert "idempotent" in result2.message.lower()
 
+    def test_apply_writes_atomically(self, engine, temp_repo):
+        """Test that applying a patch keeps file mode and leaves no temp files."""
+        target = temp_repo / "utils.py"
+        target.chmod(0o640)
+        diff = textwrap.dedent("""
+            --- utils.py
+            +++ utils.py
+            @@ -1,4 +1,5 @@
+             import os
+
+             def get_env(key):
+            +    # Return environment variable
+                 return os.environ.get(key)
+        """).strip()
+
+        result = engine.apply_patch(diff, dry_run=False)
+
+        assert result.status == "success"
+        assert "# Return environment variable" in target.read_text()
+        assert target.stat().st_mode & 0o777 == 0o640
+        assert sorted(p.name for p in temp_repo.iterdir()) == ["main.py", "utils.py"]
+
+    def test_repeated_diff_parsed_once(self, engine, temp_repo):
+        """Test that re-applying the same diff reuses the parsed hunks."""
+        diff = textwrap.dedent("""
+            --- utils.py
+            +++ utils.py
+            @@ -1,4 +1,5 @@
+             import os
+
+             def get_env(key):
+            +    # Return environment variable
+                 return os.environ.get(key)
+        """).strip()
+
+        with patch.object(engine, "_parse_unified_diff", wraps=engine._parse_unified_diff) as parse:
+            engine.apply_patch(diff, dry_run=False)
+            engine.apply_patch(diff, dry_run=False)
+            engine.get_patch_preview(diff)
+
+        assert parse.call_count == 1
+
     def test_guardrail_violation_blocked_path(self, temp_repo):
         """Test that guardrails block files in blocked paths."""
         # Create engine with blocked paths configured
@@ -5,14 +5,14 @@ Tests for review feedback ingestion and pattern learning system.
 All tests use temporary storage for reproducibility.
 """
 
-import tempfile
-import shutil
 import json
+import os
 import pytest
 from pathlib import Path
-from datetime import datetime, timedelta
-from unittest.mock import Mock, patch
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
 
+from termnet import feedback_engine
 from termnet.feedback_engine import (
     FeedbackEngine, FeedbackParser, PatternLearner,
     FeedbackItem, FeedbackPattern, FeedbackSummary,
@@ -92,11 +92,27 @@ class TestFeedbackItem:
         )
 
         assert item.id is not None  # Should be auto-generated
-        assert len(item.id) == 8  # MD5 hash truncated to 8 chars
+        assert len(item.id) == 8  # 4-byte content digest as hex
         assert item.timestamp is not None  # Should be auto-generated
-        assert item.tags == []  # Default empty list
+        assert not item.tags  # Default empty tags
         assert item.metadata == {}  # Default empty dict
 
+    def test_feedback_item_id_is_content_derived(self):
+        """Test that identical feedback content yields the same generated ID."""
+        def make(description):
+            return FeedbackItem(
+                id=None,
+                type=FeedbackType.CODE_REVIEW,
+                severity=FeedbackSeverity.LOW,
+                title="Same title",
+                description=description,
+                file_path="src/main.py",
+                line_number=3
+            )
+
+        assert make("Same description").id == make("Same description").id
+        assert make("Same description").id != make("Other description").id
+
 
 class TestFeedbackPattern:
     """Test FeedbackPattern data structure."""
@@ -126,6 +142,86 @@ class TestFeedbackPattern:
         assert pattern.examples == ["Example 1", "Example 2"]
 
 
+@pytest.fixture(scope="module")
+def parser():
+    """Shared FeedbackParser; it keeps no state between parse calls."""
+    return FeedbackParser()
+
+
+@pytest.fixture(scope="module")
+def github_review_payload():
+    """Read-only GitHub review payload shared by the parser tests."""
+    return MappingProxyType({
+        "id": 123,
+        "state": "approved",
+        "pull_request_url": "https://github.com/owner/repo/pull/456",
+        "comments": [
+            {
+                "id": 1,
+                "body": "This code has a critical security vulnerability",
+                "path": "src/auth.py",
+                "line": 15,
+                "diff_hunk": "@@ -12,6 +12,7 @@",
+                "user": {"login": "reviewer1"},
+                "created_at": "2023-10-01T12:00:00Z",
+                "commit_id": "abc123"
+            },
+            {
+                "id": 2,
+                "body": "Minor style issue here",
+                "path": "src/utils.py",
+                "line": 25,
+                "user": {"login": "reviewer2"},
+                "created_at": "2023-10-01T13:00:00Z"
+            }
+        ]
+    })
+
+
+@pytest.fixture(scope="module")
+def test_results_payload():
+    """Read-only test results payload shared by the parser tests."""
+    return MappingProxyType({
+        "test_suite": "unit_tests",
+        "timestamp": "2023-10-01T12:00:00",
+        "test_cases": [
+            {
+                "name": "test_authentication",
+                "status": "failed",
+                "failure_message": "AssertionError: Expected True but got False",
+                "file": "tests/test_auth.py",
+                "line": 42,
+                "code": "assert result == True",
+                "category": "auth",
+                "execution_time": 0.5,
+                "error_type": "AssertionError"
+            },
+            {
+                "name": "test_success",
+                "status": "passed"
+            }
+        ]
+    })
+
+
+@pytest.fixture(scope="module")
+def corrections_payload():
+    """Read-only user corrections payload shared by the parser tests."""
+    return (
+        MappingProxyType({
+            "description": "Fix variable naming",
+            "rationale": "Variable names should be descriptive",
+            "file_path": "src/main.py",
+            "line_number": 10,
+            "original_code": "x = getValue()",
+            "corrected_code": "user_name = getValue()",
+            "timestamp": "2023-10-01T12:00:00",
+            "type": "naming",
+            "was_automated": False
+        }),
+    )
+
+
 class TestFeedbackParser:
     """Test FeedbackParser functionality."""
 
@@ -134,37 +230,9 @@ class TestFeedbackParser:
         parser = FeedbackParser()
         assert parser.logger is not None
 
-    def test_parse_github_review(self):
+    def test_parse_github_review(self, parser, github_review_payload):
         """Test parsing GitHub review comments."""
-        parser = FeedbackParser()
-
-        review_data = {
-            "id": 123,
-            "state": "approved",
-            "pull_request_url": "https://github.com/owner/repo/pull/456",
-            "comments": [
-                {
-                    "id": 1,
-                    "body": "This code has a critical security vulnerability",
-                    "path": "src/auth.py",
-                    "line": 15,
-                    "diff_hunk": "@@ -12,6 +12,7 @@",
-                    "user": {"login": "reviewer1"},
-                    "created_at": "2023-10-01T12:00:00Z",
-                    "commit_id": "abc123"
-                },
-                {
-                    "id": 2,
-                    "body": "Minor style issue here",
-                    "path": "src/utils.py",
-                    "line": 25,
-                    "user": {"login": "reviewer2"},
-                    "created_at": "2023-10-01T13:00:00Z"
-                }
-            ]
-        }
-
-        feedback_items = parser.parse_github_review(review_data)
+        feedback_items = parser.parse_github_review(github_review_payload)
 
         assert len(feedback_items) == 2
 
@@ -186,33 +254,9 @@ class TestFeedbackParser:
         assert item2.file_path == "src/utils.py"
         assert item2.reviewer == "reviewer2"
 
-    def test_parse_test_failures(self):
+    def test_parse_test_failures(self, parser, test_results_payload):
         """Test parsing test failure results."""
-        parser = FeedbackParser()
-
-        test_results = {
-            "test_suite": "unit_tests",
-            "timestamp": "2023-10-01T12:00:00",
-            "test_cases": [
-                {
-                    "name": "test_authentication",
-                    "status": "failed",
-                    "failure_message": "AssertionError: Expected True but got False",
-                    "file": "tests/test_auth.py",
-                    "line": 42,
-                    "code": "assert result == True",
-                    "category": "auth",
-                    "execution_time": 0.5,
-                    "error_type": "AssertionError"
-                },
-                {
-                    "name": "test_success",
-                    "status": "passed"
-                }
-            ]
-        }
-
-        feedback_items = parser.parse_test_failures(test_results)
+        feedback_items = parser.parse_test_failures(test_results_payload)
 
         assert len(feedback_items) == 1  # Only failed tests
 
@@ -226,25 +270,9 @@ class TestFeedbackParser:
         assert "test" in item.tags
         assert "failure" in item.tags
 
-    def test_parse_user_corrections(self):
+    def test_parse_user_corrections(self, parser, corrections_payload):
         """Test parsing user corrections."""
-        parser = FeedbackParser()
-
-        corrections = [
-            {
-                "description": "Fix variable naming",
-                "rationale": "Variable names should be descriptive",
-                "file_path": "src/main.py",
-                "line_number": 10,
-                "original_code": "x = getValue()",
-                "corrected_code": "user_name = getValue()",
-                "timestamp": "2023-10-01T12:00:00",
-                "type": "naming",
-                "was_automated": False
-            }
-        ]
-
-        feedback_items = parser.parse_user_corrections(corrections)
+        feedback_items = parser.parse_user_corrections(corrections_payload)
 
         assert len(feedback_items) == 1
 
@@ -259,54 +287,53 @@ class TestFeedbackParser:
         assert item.suggested_fix == "user_name = getValue()"
         assert "user_input" in item.tags
 
-    def test_categorize_github_comment(self):
+    @pytest.mark.parametrize("comment,expected_type", [
+        ("This has a security vulnerability", FeedbackType.SECURITY_CONCERN),
+        ("This code is slow and needs optimization", FeedbackType.PERFORMANCE_ISSUE),
+        ("Please fix the formatting here", FeedbackType.STYLE_VIOLATION),
+        ("The architecture could be improved", FeedbackType.DESIGN_FEEDBACK),
+        ("General code review comment", FeedbackType.CODE_REVIEW)
+    ])
+    def test_categorize_github_comment(self, parser, comment, expected_type):
         """Test GitHub comment categorization."""
-        parser = FeedbackParser()
-
-        test_cases = [
-            ("This has a security vulnerability", FeedbackType.SECURITY_CONCERN),
-            ("This code is slow and needs optimization", FeedbackType.PERFORMANCE_ISSUE),
-            ("Please fix the formatting here", FeedbackType.STYLE_VIOLATION),
-            ("The architecture could be improved", FeedbackType.DESIGN_FEEDBACK),
-            ("General code review comment", FeedbackType.CODE_REVIEW)
-        ]
-
-        for comment, expected_type in test_cases:
-            result = parser._categorize_github_comment(comment)
-            assert result == expected_type
-
-    def test_assess_severity(self):
+        assert parser._categorize_github_comment(comment) == expected_type
+
+    @pytest.mark.parametrize("comment,expected_severity", [
+        ("This is critical and must be fixed", FeedbackSeverity.CRITICAL),
+        ("Important issue that should be addressed", FeedbackSeverity.HIGH),
+        ("Nit: minor formatting issue", FeedbackSeverity.LOW),
+        ("FYI: informational comment", FeedbackSeverity.INFO),
+        ("Regular comment", FeedbackSeverity.MEDIUM)
+    ])
+    def test_assess_severity(self, parser, comment, expected_severity):
         """Test severity assessment."""
-        parser = FeedbackParser()
-
-        test_cases = [
-            ("This is critical and must be fixed", FeedbackSeverity.CRITICAL),
-            ("Important issue that should be addressed", FeedbackSeverity.HIGH),
-            ("Nit: minor formatting issue", FeedbackSeverity.LOW),
-            ("FYI: informational comment", FeedbackSeverity.INFO),
-            ("Regular comment", FeedbackSeverity.MEDIUM)
-        ]
-
-        for comment, expected_severity in test_cases:
-            result = parser._assess_severity(comment)
-            assert result == expected_severity
-
-    def test_extract_tags(self):
+        assert parser._assess_severity(comment) == expected_severity
+
+    @pytest.mark.parametrize("text,expected_tags", [
+        ("This is a #bug that needs fixing", ["bug"]),
+        ("Performance issue with authentication", ["performance"]),
+        ("Add documentation for this #refactor", ["refactor", "documentation"]),
+        ("Security concern with test coverage", ["security", "testing"]),
+        ("Normal comment without tags", [])
+    ])
+    def test_extract_tags(self, parser, text, expected_tags):
         """Test tag extraction from text."""
-        parser = FeedbackParser()
+        result = parser._extract_tags(text)
+        for tag in expected_tags:
+            assert tag in result
 
-        test_cases = [
-            ("This is a #bug that needs fixing", ["bug"]),
-            ("Performance issue with authentication", ["performance"]),
-            ("Add documentation for this #refactor", ["refactor", "documentation"]),
-            ("Security concern with test coverage", ["security", "testing"]),
-            ("Normal comment without tags", [])
-        ]
+    @pytest.mark.skipif(
+        not hasattr(feedback_engine._categorize_comment, "cache_info"),
+        reason="comment cache disabled via TERMNET_FEEDBACK_NOCACHE"
+    )
+    def test_repeated_comment_uses_cache(self, parser):
+        """Test that repeated comment bodies are categorized from the cache."""
+        comment = "Repeated comment about a slow query"
+        parser._categorize_github_comment(comment)
+        hits = feedback_engine._categorize_comment.cache_info().hits
 
-        for text, expected_tags in test_cases:
-            result = parser._extract_tags(text)
-            for tag in expected_tags:
-                assert tag in result
+        assert parser._categorize_github_comment(comment) == FeedbackType.PERFORMANCE_ISSUE
+        assert feedback_engine._categorize_comment.cache_info().hits == hits + 1
 
 
 class TestPatternLearner:
@@ -473,11 +500,15 @@ class TestPatternLearner:
 
 
 @pytest.fixture
-def temp_storage():
+def temp_storage(tmp_path_factory, request):
     """Create temporary storage directory for testing."""
-    temp_dir = tempfile.mkdtemp(prefix="feedback_test_")
-    yield temp_dir
-    shutil.rmtree(temp_dir, ignore_errors=True)
+    return str(tmp_path_factory.mktemp(request.node.name))
+
+
+@pytest.fixture(scope="session")
+def shared_engine(tmp_path_factory):
+    """Create one FeedbackEngine shared by tests that don't persist state."""
+    return FeedbackEngine(storage_path=str(tmp_path_factory.mktemp("shared")))
 
 
 class TestFeedbackEngine:
@@ -522,10 +553,8 @@ class TestFeedbackEngine:
         stored_files = list(feedback_dir.glob('*.json'))
         assert len(stored_files) == 1
 
-    def test_get_recommendations(self, temp_storage):
+    def test_get_recommendations(self, shared_engine):
         """Test getting recommendations based on patterns."""
-        engine = FeedbackEngine(storage_path=temp_storage)
-
         # Add a test pattern manually
         pattern = FeedbackPattern(
             pattern_id="test_pattern",
@@ -537,14 +566,17 @@ class TestFeedbackEngine:
             occurrences=10,
             last_seen="2023-10-01T12:00:00"
         )
-        engine.learner.patterns["test_pattern"] = pattern
+        shared_engine.learner.patterns["test_pattern"] = pattern
 
         context = {
             "file_path": "src/main.py",
             "tags": ["error"]
         }
 
-        recommendations = engine.get_recommendations(context)
+        try:
+            recommendations = shared_engine.get_recommendations(context)
+        finally:
+            del shared_engine.learner.patterns["test_pattern"]
 
         assert len(recommendations) > 0
         assert "Add try-catch blocks" in recommendations or "Validate input parameters" in recommendations
@@ -572,7 +604,7 @@ class TestFeedbackEngine:
         ]
 
         # Store feedback manually
-        engine._store_feedback(feedback_items)
+        engine._store_feedback_bulk(feedback_items)
 
         summary = engine.get_feedback_summary(days=30)
 
@@ -582,8 +614,114 @@ class TestFeedbackEngine:
         assert isinstance(summary.feedback_by_severity, dict)
         assert isinstance(summary.improvement_suggestions, list)
 
-    def test_storage_and_loading(self, temp_storage):
-        """Test storing and loading patterns."""
+    def test_bulk_and_legacy_feedback_loaded(self, temp_storage):
+        """Test that summaries read both JSONL batches and per-item files."""
+        engine = FeedbackEngine(storage_path=temp_storage)
+
+        engine._store_feedback_bulk([
+            FeedbackItem(
+                id=f"batch{i}",
+                type=FeedbackType.CODE_REVIEW,
+                severity=FeedbackSeverity.MEDIUM,
+                title=f"Batch {i}",
+                description="Batched feedback"
+            )
+            for i in range(2)
+        ])
+        engine._store_feedback([
+            FeedbackItem(
+                id="legacy",
+                type=FeedbackType.STYLE_VIOLATION,
+                severity=FeedbackSeverity.LOW,
+                title="Legacy",
+                description="Per-item feedback"
+            )
+        ])
+
+        summary = engine.get_feedback_summary()
+
+        assert summary.total_feedback_items == 3
+        assert summary.feedback_by_type == {"code_review": 2, "style_violation": 1}
+
+    def test_feedback_summary_scans_storage_once(self, temp_storage):
+        """Test that repeated summaries reuse loaded feedback and see new items."""
+        engine = FeedbackEngine(storage_path=temp_storage)
+
+        def make(item_id):
+            return FeedbackItem(
+                id=item_id,
+                type=FeedbackType.CODE_REVIEW,
+                severity=FeedbackSeverity.MEDIUM,
+                title=item_id,
+                description="Cached feedback"
+            )
+
+        engine._store_feedback([make("first")])
+        scanned = []
+        original_iter = engine._iter_feedback_records
+
+        def counting_iter(feedback_dir):
+            scanned.append(feedback_dir)
+            return original_iter(feedback_dir)
+
+        engine._iter_feedback_records = counting_iter
+
+        assert engine.get_feedback_summary().total_feedback_items == 1
+        engine._store_feedback_bulk([make("second")])
+        assert engine.get_feedback_summary().total_feedback_items == 2
+        assert len(scanned) == 1
+
+    def test_feedback_summary_filters_by_age(self, temp_storage):
+        """Test that summaries drop old feedback across timestamp formats."""
+        engine = FeedbackEngine(storage_path=temp_storage)
+        now = datetime.now()
+
+        def make(item_id, timestamp):
+            return FeedbackItem(
+                id=item_id,
+                type=FeedbackType.CODE_REVIEW,
+                severity=FeedbackSeverity.MEDIUM,
+                title=item_id,
+                description="Aged feedback",
+                timestamp=timestamp
+            )
+
+        engine._store_feedback_bulk([
+            make("recent_naive", (now - timedelta(days=1)).isoformat()),
+            make("recent_utc", (datetime.now(timezone.utc) - timedelta(days=1)).replace(tzinfo=None).isoformat() + "Z"),
+            make("old_naive", (now - timedelta(days=60)).isoformat()),
+            make("old_utc", "2000-01-01T00:00:00Z"),
+            make("unparseable", "not a timestamp")
+        ])
+
+        summary = FeedbackEngine(storage_path=temp_storage).get_feedback_summary(days=30)
+
+        assert summary.total_feedback_items == 3
+
+    def test_pattern_json_roundtrip(self, shared_engine):
+        """Test that serialized patterns deserialize to equal patterns."""
+        pattern = FeedbackPattern(
+            pattern_id="test_roundtrip",
+            pattern_type="test",
+            description="Test pattern for serialization",
+            conditions=["test_condition"],
+            recommendations=["test_recommendation"],
+            confidence_score=0.5,
+            occurrences=1,
+            last_seen="2023-10-01T12:00:00",
+            examples=["example"]
+        )
+        shared_engine.learner.patterns["test_roundtrip"] = pattern
+
+        try:
+            blob = shared_engine._serialize_patterns()
+        finally:
+            del shared_engine.learner.patterns["test_roundtrip"]
+
+        assert FeedbackEngine._deserialize_patterns(blob)["test_roundtrip"] == pattern
+
+    def test_engine_reload_from_disk(self, temp_storage):
+        """Test that a new engine loads stored patterns from disk."""
         engine = FeedbackEngine(storage_path=temp_storage)
 
         # Add a pattern
@@ -610,16 +748,38 @@ class TestFeedbackEngine:
         assert loaded_pattern.pattern_id == "test_storage"
         assert loaded_pattern.description == "Test pattern for storage"
 
+    def test_store_patterns_skips_unchanged_write(self, temp_storage):
+        """Test that storing unchanged patterns leaves patterns.json untouched."""
+        engine = FeedbackEngine(storage_path=temp_storage)
+        engine.learner.patterns["skip_pattern"] = FeedbackPattern(
+            pattern_id="skip_pattern",
+            pattern_type="test",
+            description="Unchanged pattern",
+            conditions=["test"],
+            recommendations=["test recommendation"],
+            confidence_score=0.5,
+            occurrences=1,
+            last_seen="2023-10-01T12:00:00"
+        )
+        engine._store_patterns()
+
+        patterns_file = Path(temp_storage) / 'patterns.json'
+        os.utime(patterns_file, ns=(0, 0))
 
-class TestFeedbackEngineIntegration:
-    """Integration tests for feedback engine workflow."""
+        engine._store_patterns()
+        FeedbackEngine(storage_path=temp_storage)._store_patterns()
+        assert patterns_file.stat().st_mtime_ns == 0
 
-    def test_full_feedback_workflow(self, temp_storage):
-        """Test complete feedback ingestion and learning workflow."""
-        engine = FeedbackEngine(storage_path=temp_storage)
+        engine.learner.patterns["skip_pattern"].occurrences = 2
+        engine._store_patterns()
+        assert patterns_file.stat().st_mtime_ns != 0
 
-        # Simulate multiple similar feedback items over time
-        review_data_1 = {
+
+@pytest.fixture(scope="module")
+def review_payloads():
+    """Read-only sequence of single-comment GitHub reviews."""
+    return (
+        MappingProxyType({
             "id": 1,
             "comments": [
                 {
@@ -630,9 +790,8 @@ class TestFeedbackEngineIntegration:
                     "created_at": "2023-10-01T12:00:00Z"
                 }
             ]
-        }
-
-        review_data_2 = {
+        }),
+        MappingProxyType({
             "id": 2,
             "comments": [
                 {
@@ -643,14 +802,38 @@ class TestFeedbackEngineIntegration:
                     "created_at": "2023-10-01T13:00:00Z"
                 }
             ]
-        }
+        }),
+        MappingProxyType({
+            "id": 3,
+            "comments": [
+                {
+                    "id": 3,
+                    "body": "Function is missing type hints for its return value",
+                    "path": "src/api.py",
+                    "user": {"login": "reviewer3"},
+                    "created_at": "2023-10-01T14:00:00Z"
+                }
+            ]
+        }),
+    )
 
-        # Ingest feedback
-        feedback_1 = engine.ingest_github_review(review_data_1)
-        feedback_2 = engine.ingest_github_review(review_data_2)
 
-        assert len(feedback_1) == 1
-        assert len(feedback_2) == 1
+class TestFeedbackEngineIntegration:
+    """Integration tests for feedback engine workflow."""
+
+    @pytest.mark.parametrize("review_count", [1, 2, 3], ids=["one_review", "two_reviews", "three_reviews"])
+    def test_full_feedback_workflow(self, temp_storage, review_payloads, review_count):
+        """Test complete feedback ingestion and learning workflow."""
+        engine = FeedbackEngine(storage_path=temp_storage)
+
+        # Ingest similar feedback over time
+        ingested = []
+        for review_data in review_payloads[:review_count]:
+            feedback = engine.ingest_github_review(review_data)
+            assert len(feedback) == 1
+            ingested.extend(feedback)
+
+        assert len({item.id for item in ingested}) == review_count
 
         # Check if patterns were learned (may be 0 if feedback isn't similar enough)
         assert len(engine.learner.patterns) >= 0
@@ -667,6 +850,28 @@ class TestFeedbackEngineIntegration:
         assert summary.total_feedback_items >= 0  # May be 0 due to time filtering
         assert summary.confidence_score >= 0
 
+        # Without the age filter every ingested review is counted
+        assert engine.get_feedback_summary(days=36500).total_feedback_items == review_count
+
+    def test_feedback_json_roundtrip(self):
+        """Test that feedback records survive serialization unchanged."""
+        feedback_item = FeedbackItem(
+            id="roundtrip_test",
+            type=FeedbackType.SECURITY_CONCERN,
+            severity=FeedbackSeverity.HIGH,
+            title="Roundtrip test",
+            description="Testing feedback serialization",
+            file_path="src/auth.py",
+            line_number=7,
+            tags=["security"],
+            metadata={"pr_number": "12"}
+        )
+
+        blob = feedback_engine._dumps(FeedbackEngine._feedback_to_dict(feedback_item))
+        restored = FeedbackEngine._feedback_from_dict(feedback_engine._loads(blob))
+
+        assert restored == feedback_item
+
     def test_feedback_persistence(self, temp_storage):
         """Test that feedback persists across engine restarts."""
         # Create engine and add feedback
@@ -680,28 +885,10 @@ class TestFeedbackEngineIntegration:
             description="Testing feedback persistence"
         )
 
-        engine1._store_feedback([feedback_item])
+        engine1._store_feedback_bulk([feedback_item])
+        assert len(list((Path(temp_storage) / 'feedback').glob('*.jsonl'))) == 1
 
-        # Add pattern
-        pattern = FeedbackPattern(
-            pattern_id="persist_pattern",
-            pattern_type="test",
-            description="Persistence test pattern",
-            conditions=["test"],
-            recommendations=["test recommendation"],
-            confidence_score=0.7,
-            occurrences=1,
-            last_seen="2023-10-01T12:00:00"
-        )
-        engine1.learner.patterns["persist_pattern"] = pattern
-        engine1._store_patterns()
-
-        # Create new engine and verify data is loaded
+        # Create new engine and check feedback can be loaded in summary
         engine2 = FeedbackEngine(storage_path=temp_storage)
-
-        # Check patterns loaded
-        assert "persist_pattern" in engine2.learner.patterns
-
-        # Check feedback can be loaded in summary
         summary = engine2.get_feedback_summary()
-        assert summary.total_feedback_items >= 1
\ No newline at end of file
+        assert summary.total_feedback_items >= 1
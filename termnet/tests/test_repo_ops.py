@@ -5,56 +5,110 @@ Ensures safe git operations and PR management capabilities.
 All tests use temporary repositories for complete isolation.
 """
 
+import json
 import os
-import tempfile
+import shutil
 import subprocess
+from collections import deque
 from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import patch
 import pytest
 
 from termnet.repo_ops import GitClient, PRClient, RepoOperations, GitResult, PRInfo
 
 
-class TestGitClient:
-    """Test GitClient functionality."""
+_PR_VIEW = {
+    "number": 123,
+    "title": "Test PR",
+    "body": "Test body",
+    "state": "OPEN",
+    "headRefOid": "abc123",
+    "baseRefName": "main",
+    "url": "https://github.com/user/repo/pull/123",
+}
+_PR_JSON = json.dumps(_PR_VIEW)
+# gh returns full PR descriptions, which are often several KB of markdown
+_PR_JSON_LARGE_BODY = json.dumps({**_PR_VIEW, "body": "## Summary\n" + "- change ✓ détail\n" * 400})
 
-    @pytest.fixture
-    def temp_git_repo(self):
-        """Create a temporary git repository for testing."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            repo_path = Path(temp_dir)
 
-            # Initialize git repo
-            subprocess.run(["git", "init"], cwd=repo_path, check=True)
-            subprocess.run(["git", "config", "user.name", "Test User"], cwd=repo_path, check=True)
-            subprocess.run(["git", "config", "user.email", "test@example.com"], cwd=repo_path, check=True)
+class FakeSubprocess:
+    """Stand-in for the subprocess module that replays queued results."""
 
-            # Create initial commit
-            test_file = repo_path / "README.md"
-            test_file.write_text("# Test Repository\n")
-            subprocess.run(["git", "add", "README.md"], cwd=repo_path, check=True)
-            subprocess.run(["git", "commit", "-m", "Initial commit"], cwd=repo_path, check=True)
+    TimeoutExpired = subprocess.TimeoutExpired
 
-            yield repo_path
+    def __init__(self):
+        self._results = deque()
+        self.calls = []
+
+    def queue(self, returncode=0, stdout="", stderr="", raises=None):
+        """Queue the outcome of the next run() call; ``raises`` is raised instead."""
+        self._results.append((raises, returncode, stdout, stderr))
+
+    def run(self, args, **kwargs):
+        self.calls.append(args)
+        raises, returncode, stdout, stderr = self._results.popleft()
+        if raises is not None:
+            raise raises
+        return subprocess.CompletedProcess(args, returncode, stdout, stderr)
 
-    @pytest.fixture
-    def git_client(self, temp_git_repo):
-        """Create GitClient instance for testing."""
-        return GitClient(str(temp_git_repo))
 
-    def test_git_client_initialization(self, temp_git_repo):
+@pytest.fixture
+def fake_subprocess(monkeypatch):
+    """Replace subprocess in termnet.repo_ops with a FakeSubprocess."""
+    fake = FakeSubprocess()
+    monkeypatch.setattr("termnet.repo_ops.subprocess", fake)
+    return fake
+
+
+class TestGitClientReadOnly:
+    """Test GitClient queries that never modify the repository."""
+
+    @pytest.fixture(scope="class")
+    def shared_git_repo(self, _git_template, tmp_path_factory):
+        """One copy of the template repository shared by the whole class."""
+        repo_path = tmp_path_factory.mktemp("shared_git_repo")
+        shutil.copytree(_git_template, repo_path, dirs_exist_ok=True)
+        return repo_path
+
+    @pytest.fixture(scope="class")
+    def git_client(self, shared_git_repo):
+        """Create GitClient instance shared by the read-only tests."""
+        return GitClient(str(shared_git_repo))
+
+    def test_git_client_initialization(self, shared_git_repo):
         """Test GitClient initialization and configuration."""
         config = {
             "branch_prefix": "test/",
             "max_commit_size": 500000
         }
-        client = GitClient(str(temp_git_repo), config)
+        client = GitClient(str(shared_git_repo), config)
 
-        assert client.repo_path == temp_git_repo.resolve()
+        assert client.repo_path == shared_git_repo.resolve()
         assert client.config["branch_prefix"] == "test/"
         assert client.config["max_commit_size"] == 500000
         assert "commit_message_template" in client.config  # Default value
 
+    def test_get_current_branch(self, git_client):
+        """Test current branch detection."""
+        branch = git_client.get_current_branch()
+        # Fresh repo might be on 'main' or 'master'
+        assert branch in ["main", "master"] or branch != "unknown"
+
+    def test_get_current_sha(self, git_client):
+        """Test current commit SHA retrieval."""
+        sha = git_client.get_current_sha()
+        assert len(sha) == 40  # Full SHA length
+        assert all(c in "0123456789abcdef" for c in sha.lower())
+
+
+class TestGitClient:
+    """Test GitClient functionality."""
+
+    @pytest.fixture
+    def git_client(self, temp_git_repo):
+        """Create GitClient instance for testing."""
+        return GitClient(str(temp_git_repo))
+
     def test_status_command(self, git_client, temp_git_repo):
         """Test git status functionality."""
         # Clean repo should have empty status
@@ -81,18 +135,6 @@ class TestGitClient:
 
         assert not git_client.is_clean()
 
-    def test_get_current_branch(self, git_client):
-        """Test current branch detection."""
-        branch = git_client.get_current_branch()
-        # Fresh repo might be on 'main' or 'master'
-        assert branch in ["main", "master"] or branch != "unknown"
-
-    def test_get_current_sha(self, git_client):
-        """Test current commit SHA retrieval."""
-        sha = git_client.get_current_sha()
-        assert len(sha) == 40  # Full SHA length
-        assert all(c in "0123456789abcdef" for c in sha.lower())
-
     def test_add_files(self, git_client, temp_git_repo):
         """Test file staging functionality."""
         # Create test files
@@ -162,26 +204,34 @@ class TestGitClient:
         assert "Detailed description" in log_result.stdout
         assert "TermNet" in log_result.stdout
 
-    @patch('subprocess.run')
-    def test_git_command_timeout(self, mock_run, git_client):
+    def test_git_command_timeout(self, fake_subprocess, git_client):
         """Test git command timeout handling."""
-        mock_run.side_effect = subprocess.TimeoutExpired(cmd=["git", "status"], timeout=30)
+        fake_subprocess.queue(raises=subprocess.TimeoutExpired(cmd=["git", "status"], timeout=30))
 
         result = git_client.status()
         assert not result.success
         assert "timed out" in result.message
         assert result.return_code == -1
 
-    @patch('subprocess.run')
-    def test_git_command_exception(self, mock_run, git_client):
+    def test_git_command_exception(self, fake_subprocess, git_client):
         """Test git command exception handling."""
-        mock_run.side_effect = Exception("Mock error")
+        fake_subprocess.queue(raises=Exception("Mock error"))
 
         result = git_client.status()
         assert not result.success
         assert "failed" in result.message
         assert result.return_code == -1
 
+    def test_git_binary_resolved_once(self, fake_subprocess, temp_git_repo):
+        """Test the configured git binary is used for every command."""
+        client = GitClient(str(temp_git_repo), {"git_binary": "/opt/git/bin/git"})
+        fake_subprocess.queue()
+
+        client.status()
+
+        assert fake_subprocess.calls[-1][0] == "/opt/git/bin/git"
+        assert Path(GitClient(str(temp_git_repo)).config["git_binary"]).name == "git"
+
     def test_reset_to_commit(self, git_client, temp_git_repo):
         """Test repository reset functionality."""
         # Get initial commit SHA
@@ -205,39 +255,30 @@ class TestPRClient:
     """Test PRClient functionality with mocked GitHub CLI."""
 
     @pytest.fixture
-    def temp_git_repo(self):
-        """Create a temporary git repository."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            repo_path = Path(temp_dir)
-            subprocess.run(["git", "init"], cwd=repo_path, check=True)
-            yield repo_path
+    def repo_dir(self, tmp_path):
+        """Plain directory; PRClient only stores the path and gh calls are faked."""
+        return tmp_path
 
     @pytest.fixture
-    def pr_client(self, temp_git_repo):
+    def pr_client(self, repo_dir):
         """Create PRClient instance for testing."""
-        return PRClient(str(temp_git_repo))
+        return PRClient(str(repo_dir))
 
-    def test_pr_client_initialization(self, temp_git_repo):
+    def test_pr_client_initialization(self, repo_dir):
         """Test PRClient initialization."""
         config = {
             "draft_by_default": False,
             "require_reviews": 2
         }
-        client = PRClient(str(temp_git_repo), config)
+        client = PRClient(str(repo_dir), config)
 
-        assert client.repo_path == temp_git_repo.resolve()
+        assert client.repo_path == repo_dir.resolve()
         assert client.config["draft_by_default"] is False
         assert client.config["require_reviews"] == 2
 
-    @patch('subprocess.run')
-    def test_create_pr_success(self, mock_run, pr_client):
+    def test_create_pr_success(self, fake_subprocess, pr_client):
         """Test successful PR creation."""
-        # Mock successful gh command
-        mock_result = Mock()
-        mock_result.returncode = 0
-        mock_result.stdout = "https://github.com/user/repo/pull/123"
-        mock_result.stderr = ""
-        mock_run.return_value = mock_result
+        fake_subprocess.queue(stdout="https://github.com/user/repo/pull/123")
 
         result = pr_client.create_pr("Test PR", "Test description")
 
@@ -246,95 +287,65 @@ class TestPRClient:
         assert "https://github.com/user/repo/pull/123" in result.stdout
 
         # Verify gh command was called correctly
-        mock_run.assert_called_once()
-        args = mock_run.call_args[0][0]
+        assert len(fake_subprocess.calls) == 1
+        args = fake_subprocess.calls[0]
         assert "gh" in args
         assert "pr" in args
         assert "create" in args
         assert "--draft" in args  # Should be draft by default
 
-    @patch('subprocess.run')
-    def test_create_pr_with_empty_body(self, mock_run, pr_client):
+    def test_create_pr_with_empty_body(self, fake_subprocess, pr_client):
         """Test PR creation with auto-generated body."""
-        mock_result = Mock()
-        mock_result.returncode = 0
-        mock_result.stdout = "https://github.com/user/repo/pull/124"
-        mock_result.stderr = ""
-        mock_run.return_value = mock_result
+        fake_subprocess.queue()  # git diff for the changed-files list
+        fake_subprocess.queue(stdout="https://github.com/user/repo/pull/124")
 
         result = pr_client.create_pr("Auto body test")
 
         assert result.success
         # Verify template was used
-        call_args = mock_run.call_args[0][0]
+        call_args = fake_subprocess.calls[-1]
         body_index = call_args.index("--body") + 1
         body_content = call_args[body_index]
         assert "## Summary" in body_content
         assert "TermNet" in body_content
 
-    @patch('subprocess.run')
-    def test_get_pr_info_success(self, mock_run, pr_client):
+    @pytest.mark.parametrize("pr_json", [_PR_JSON, _PR_JSON_LARGE_BODY], ids=["short_body", "large_body"])
+    def test_get_pr_info_success(self, fake_subprocess, pr_client, pr_json):
         """Test successful PR info retrieval."""
-        mock_result = Mock()
-        mock_result.returncode = 0
-        mock_result.stdout = '{"number": 123, "title": "Test PR", "body": "Test body", "state": "OPEN", "headRefOid": "abc123", "baseRefName": "main", "url": "https://github.com/user/repo/pull/123"}'
-        mock_result.stderr = ""
-        mock_run.return_value = mock_result
+        fake_subprocess.queue(stdout=pr_json)
 
         pr_info = pr_client.get_pr_info(123)
 
         assert pr_info is not None
+        assert pr_info.body == json.loads(pr_json)["body"]
         assert pr_info.number == 123
         assert pr_info.title == "Test PR"
         assert pr_info.state == "OPEN"
         assert pr_info.head_sha == "abc123"
 
-    @patch('subprocess.run')
-    def test_get_pr_info_not_found(self, mock_run, pr_client):
+    def test_get_pr_info_not_found(self, fake_subprocess, pr_client):
         """Test PR info retrieval for nonexistent PR."""
-        mock_result = Mock()
-        mock_result.returncode = 1
-        mock_result.stdout = ""
-        mock_result.stderr = "could not resolve to a PullRequest"
-        mock_run.return_value = mock_result
+        fake_subprocess.queue(returncode=1, stderr="could not resolve to a PullRequest")
 
         pr_info = pr_client.get_pr_info(999)
         assert pr_info is None
 
-    @patch('subprocess.run')
-    def test_update_pr(self, mock_run, pr_client):
-        """Test PR update functionality."""
-        mock_result = Mock()
-        mock_result.returncode = 0
-        mock_result.stdout = "Updated pull request"
-        mock_result.stderr = ""
-        mock_run.return_value = mock_result
-
-        result = pr_client.update_pr(123, title="New title", body="New body")
+    @pytest.mark.parametrize("invoke, stdout, expected_args", [
+        (lambda client: client.update_pr(123, title="New title", body="New body"),
+         "Updated pull request", ("pr", "edit", "123", "--title", "New title")),
+        (lambda client: client.merge_pr(123, merge_method="squash"),
+         "Merged pull request", ("pr", "merge", "123", "--squash")),
+    ], ids=["update_pr", "merge_pr_valid_method"])
+    def test_pr_command_arguments(self, fake_subprocess, pr_client, invoke, stdout, expected_args):
+        """Test PR update/merge succeed and pass the expected gh arguments."""
+        fake_subprocess.queue(stdout=stdout)
 
-        assert result.success
-        # Verify correct arguments
-        args = mock_run.call_args[0][0]
-        assert "pr" in args
-        assert "edit" in args
-        assert "123" in args
-        assert "--title" in args
-        assert "New title" in args
-
-    @patch('subprocess.run')
-    def test_merge_pr_with_valid_method(self, mock_run, pr_client):
-        """Test PR merge with valid method."""
-        mock_result = Mock()
-        mock_result.returncode = 0
-        mock_result.stdout = "Merged pull request"
-        mock_result.stderr = ""
-        mock_run.return_value = mock_result
-
-        result = pr_client.merge_pr(123, merge_method="squash")
+        result = invoke(pr_client)
 
         assert result.success
-        args = mock_run.call_args[0][0]
-        assert "--squash" in args
+        args = fake_subprocess.calls[-1]
+        for expected in expected_args:
+            assert expected in args
 
     def test_merge_pr_with_invalid_method(self, pr_client):
         """Test PR merge with invalid method."""
@@ -343,10 +354,9 @@ class TestPRClient:
         assert not result.success
         assert "Invalid merge method" in result.message
 
-    @patch('subprocess.run')
-    def test_gh_command_timeout(self, mock_run, pr_client):
+    def test_gh_command_timeout(self, fake_subprocess, pr_client):
         """Test GitHub CLI command timeout handling."""
-        mock_run.side_effect = subprocess.TimeoutExpired(cmd=["gh", "pr", "list"], timeout=60)
+        fake_subprocess.queue(raises=subprocess.TimeoutExpired(cmd=["gh", "pr", "list"], timeout=60))
 
         result = pr_client.list_prs()
         assert not result.success
@@ -356,25 +366,6 @@ class TestPRClient:
 class TestRepoOperations:
     """Test high-level RepoOperations functionality."""
 
-    @pytest.fixture
-    def temp_git_repo(self):
-        """Create a temporary git repository."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            repo_path = Path(temp_dir)
-
-            # Initialize git repo
-            subprocess.run(["git", "init"], cwd=repo_path, check=True)
-            subprocess.run(["git", "config", "user.name", "Test User"], cwd=repo_path, check=True)
-            subprocess.run(["git", "config", "user.email", "test@example.com"], cwd=repo_path, check=True)
-
-            # Create initial commit
-            test_file = repo_path / "README.md"
-            test_file.write_text("# Test Repository\n")
-            subprocess.run(["git", "add", "README.md"], cwd=repo_path, check=True)
-            subprocess.run(["git", "commit", "-m", "Initial commit"], cwd=repo_path, check=True)
-
-            yield repo_path
-
     @pytest.fixture
     def repo_ops(self, temp_git_repo):
         """Create RepoOperations instance for testing."""
@@ -455,81 +446,35 @@ class TestRepoOperations:
         assert isinstance(state["changed_files"], list)
 
 
-class TestGitResult:
-    """Test GitResult data structure."""
-
-    def test_git_result_creation(self):
-        """Test GitResult creation and attributes."""
-        result = GitResult(
-            success=True,
-            message="Operation completed",
-            stdout="output text",
-            stderr="",
-            return_code=0
-        )
-
-        assert result.success is True
-        assert result.message == "Operation completed"
-        assert result.stdout == "output text"
-        assert result.stderr == ""
-        assert result.return_code == 0
-
-    def test_git_result_defaults(self):
-        """Test GitResult default values."""
-        result = GitResult(success=False, message="Failed")
-
-        assert result.success is False
-        assert result.message == "Failed"
-        assert result.stdout == ""
-        assert result.stderr == ""
-        assert result.return_code == 0
-
-
-class TestPRInfo:
-    """Test PRInfo data structure."""
-
-    def test_pr_info_creation(self):
-        """Test PRInfo creation and attributes."""
-        pr_info = PRInfo(
-            number=123,
-            title="Test PR",
-            body="Test description",
-            state="OPEN",
-            head_sha="abc123def",
-            base_branch="main",
-            url="https://github.com/user/repo/pull/123"
-        )
-
-        assert pr_info.number == 123
-        assert pr_info.title == "Test PR"
-        assert pr_info.state == "OPEN"
-        assert pr_info.head_sha == "abc123def"
-        assert pr_info.base_branch == "main"
-        assert pr_info.url == "https://github.com/user/repo/pull/123"
+class TestResultDataclasses:
+    """Test GitResult and PRInfo data structures."""
+
+    @pytest.mark.parametrize("cls, kwargs, expected", [
+        (GitResult,
+         dict(success=True, message="Operation completed", stdout="output text", stderr="", return_code=0),
+         dict(success=True, message="Operation completed", stdout="output text", stderr="", return_code=0)),
+        (GitResult,
+         dict(success=False, message="Failed"),
+         dict(success=False, message="Failed", stdout="", stderr="", return_code=0)),
+        (PRInfo,
+         dict(number=123, title="Test PR", body="Test description", state="OPEN",
+              head_sha="abc123def", base_branch="main", url="https://github.com/user/repo/pull/123"),
+         dict(number=123, title="Test PR", state="OPEN", head_sha="abc123def",
+              base_branch="main", url="https://github.com/user/repo/pull/123")),
+    ], ids=["git_result_creation", "git_result_defaults", "pr_info_creation"])
+    def test_dataclass_attributes(self, cls, kwargs, expected):
+        """Test dataclass creation, attributes and default values."""
+        obj = cls(**kwargs)
+
+        for name, value in expected.items():
+            actual = getattr(obj, name)
+            assert actual == value
+            assert type(actual) is type(value)  # keeps the old `is True/False` strictness
 
 
 class TestRepoOpsIntegration:
     """Integration tests for complete repository operations workflow."""
 
-    @pytest.fixture
-    def temp_git_repo(self):
-        """Create a temporary git repository."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            repo_path = Path(temp_dir)
-
-            # Initialize git repo
-            subprocess.run(["git", "init"], cwd=repo_path, check=True)
-            subprocess.run(["git", "config", "user.name", "Test User"], cwd=repo_path, check=True)
-            subprocess.run(["git", "config", "user.email", "test@example.com"], cwd=repo_path, check=True)
-
-            # Create initial commit
-            test_file = repo_path / "README.md"
-            test_file.write_text("# Test Repository\n")
-            subprocess.run(["git", "add", "README.md"], cwd=repo_path, check=True)
-            subprocess.run(["git", "commit", "-m", "Initial commit"], cwd=repo_path, check=True)
-
-            yield repo_path
-
     def test_complete_feature_workflow(self, temp_git_repo):
         """Test complete workflow from feature branch to commit."""
         repo_ops = RepoOperations(str(temp_git_repo))
@@ -5,6 +5,7 @@ Tests for secure code execution environment with resource limits and security co
 All tests use isolated sandbox environments for reproducibility.
 """
 
+import sys
 import tempfile
 import shutil
 import pytest
@@ -12,13 +13,23 @@ import time
 from pathlib import Path
 from unittest.mock import Mock, patch
 
-# Mock psutil to avoid dependency issues
-with patch.dict('sys.modules', {'psutil': Mock()}):
-    from termnet.sandbox import (
-        SecurityPolicy, ResourceLimits,
-        SandboxType, SecurityLevel, SandboxResult,
-        Sandbox  # Import the newly exported Sandbox class
-    )
+# Stub psutil only when it is not installed to avoid dependency issues
+try:
+    import psutil  # noqa: F401
+except ImportError:
+    sys.modules['psutil'] = Mock()
+
+from termnet.sandbox import (
+    SecurityPolicy, ResourceLimits,
+    SandboxType, SecurityLevel, SandboxResult,
+    Sandbox  # Import the newly exported Sandbox class
+)
+
+
+@pytest.fixture(scope="module")
+def policy():
+    """SecurityPolicy shared by the module; assessing commands does not mutate it."""
+    return SecurityPolicy()
 
 
 class TestResourceLimits:
@@ -91,10 +102,8 @@ class TestSecurityPolicy:
         assert SecurityLevel.TRUSTED in policy.security_levels
         assert SecurityLevel.ISOLATED in policy.security_levels
 
-    def test_blocked_commands_detection(self):
+    def test_blocked_commands_detection(self, policy):
         """Test detection of blocked command patterns."""
-        policy = SecurityPolicy()
-
         # Test dangerous commands
         dangerous_commands = [
             "rm -rf /",
@@ -108,10 +117,8 @@ class TestSecurityPolicy:
             level, violations = policy.assess_command_security(cmd)
             assert len(violations) > 0, f"Command should be blocked: {cmd}"
 
-    def test_allowed_commands_detection(self):
+    def test_allowed_commands_detection(self, policy):
         """Test detection of allowed command patterns."""
-        policy = SecurityPolicy()
-
         # Test safe commands
         safe_commands = [
             "ls -la",
@@ -129,10 +136,8 @@ class TestSecurityPolicy:
             assert level in [SecurityLevel.TRUSTED, SecurityLevel.LIMITED, SecurityLevel.RESTRICTED], \
                 f"Safe command should be allowed: {cmd}"
 
-    def test_security_level_assignment(self):
+    def test_security_level_assignment(self, policy):
         """Test security level assignment based on command analysis."""
-        policy = SecurityPolicy()
-
         # Test command categorization
         test_cases = [
             ("ls -la", [SecurityLevel.TRUSTED, SecurityLevel.LIMITED]),
@@ -200,19 +205,15 @@ class TestSandbox:
         assert result.success == True
         assert result.output == "test output"
 
-    def test_security_assessment_integration(self):
+    def test_security_assessment_integration(self, policy):
         """Test security assessment integration."""
-        policy = SecurityPolicy()
-
         # Test command assessment
         level, violations = policy.assess_command_security("ls -la")
         assert isinstance(level, SecurityLevel)
         assert isinstance(violations, list)
 
-    def test_resource_limit_configuration(self):
+    def test_resource_limit_configuration(self, policy):
         """Test resource limit configuration."""
-        policy = SecurityPolicy()
-
         # Test different security levels have appropriate limits
         trusted_limits = policy.security_levels[SecurityLevel.TRUSTED]
         isolated_limits = policy.security_levels[SecurityLevel.ISOLATED]
@@ -431,10 +432,8 @@ class TestSandboxTypes:
         assert SecurityLevel.RESTRICTED.value == "restricted"
         assert SecurityLevel.ISOLATED.value == "isolated"
 
-    def test_security_level_ordering(self):
+    def test_security_level_ordering(self, policy):
         """Test that security levels are properly ordered by restrictiveness."""
-        policy = SecurityPolicy()
-
         trusted = policy.security_levels[SecurityLevel.TRUSTED]
         limited = policy.security_levels[SecurityLevel.LIMITED]
         restricted = policy.security_levels[SecurityLevel.RESTRICTED]